@@ -1,28 +1,17 @@
 from Models.adminModels import Admin_And_User
 from Models.landModels import Land
-from flask import request, jsonify
+from flask import request, jsonify, g
 from datetime import datetime, timedelta
-import jwt
-import os
+from Utils.CheckAuthorization import CheckAuthorization
+from Utils.passwordHasher import PasswordHasher, PasswordHasherBusy
+from Utils.authContext import require_admin
+from Utils.batchSerializer import BatchSerializer
+from Utils.dashboardStats import DashboardStats
 
 class AdminController:
+    @require_admin(envelope=True)
     def get_all_users():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"success": False, "error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"success": False, "error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"success": False, "error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"success": False, "error": "Invalid token"}), 401
-            
             # Get all users
             users = Admin_And_User.objects()
             users_list = []
@@ -41,42 +30,21 @@ class AdminController:
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
     
+    @require_admin
     def get_dashboard_stats():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
-            # Get dashboard statistics
-            total_users = Admin_And_User.objects.count()
-            total_lands = Land.objects.count()
-            pending_lands = Land.objects(status='pending').count()
-            available_lands = Land.objects(status='available').count()
-            sold_lands = Land.objects(status='sold').count()
-            
-            # Get recent activities
-            recent_lands = Land.objects().order_by('-created_at').limit(5)
-            recent_users = Admin_And_User.objects().order_by('-created_at').limit(5)
+            # Totals are read from the stats_counters documents
+            land_stats = DashboardStats.land_stats(recent=5)
+            user_stats = DashboardStats.user_stats(recent=5)
             
             stats = {
-                "total_users": total_users,
-                "total_lands": total_lands,
-                "pending_lands": pending_lands,
-                "available_lands": available_lands,
-                "sold_lands": sold_lands,
-                "recent_lands": [land.to_json() for land in recent_lands],
-                "recent_users": [user.to_json() for user in recent_users]
+                "total_users": user_stats['total'],
+                "total_lands": land_stats['total'],
+                "pending_lands": land_stats['by_status']['pending'],
+                "available_lands": land_stats['by_status']['available'],
+                "sold_lands": land_stats['by_status']['sold'],
+                "recent_lands": land_stats['recent'],
+                "recent_users": user_stats['recent']
             }
             
             return jsonify(stats), 200
@@ -84,49 +52,21 @@ class AdminController:
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
+    @require_admin
     def get_pending_lands():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
             # Get pending lands
             pending_lands = Land.objects(status='pending')
-            lands_list = [land.to_json() for land in pending_lands]
+            lands_list = BatchSerializer.lands(pending_lands)
             
             return jsonify(lands_list), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
+    @require_admin
     def approve_land():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
             data = request.json
             land_id = data.get('land_id')
             status = data.get('status')  # 'approved' or 'rejected'
@@ -148,29 +88,15 @@ class AdminController:
             
             return jsonify({
                 "message": f"Land {status} successfully",
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
+    @require_admin
     def update_user():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
             user_id = request.args.get('id')
             if not user_id:
                 return jsonify({"error": "User ID is required"}), 400
@@ -190,36 +116,27 @@ class AdminController:
             if 'full_name' in data:
                 user.full_name = data['full_name']
             if 'password' in data:
-                from werkzeug.security import generate_password_hash
-                user.password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+                user.password = PasswordHasher.hash(data['password'])
             
             user.save()
+            if 'password' in data:
+                CheckAuthorization.revoke_tokens(user.id)
+            else:
+                CheckAuthorization.invalidate_user(user.id)
             
             return jsonify({
                 "message": "User updated successfully",
                 "user": user.to_json()
             }), 200
             
+        except PasswordHasherBusy as busy:
+            return jsonify({"error": str(busy)}), 503, {"Retry-After": str(busy.retry_after)}
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
+    @require_admin
     def delete_user():
         try:
-            # Check if user is admin
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token and check role
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                if payload.get('role') != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
             user_id = request.args.get('id')
             if not user_id:
                 return jsonify({"error": "User ID is required"}), 400
@@ -229,10 +146,11 @@ class AdminController:
                 return jsonify({"error": "User not found"}), 404
             
             # Check if user is trying to delete themselves
-            if str(user.id) == payload.get('user_id'):
+            if str(user.id) == g.principal.user_id:
                 return jsonify({"error": "Cannot delete your own account"}), 400
             
             user.delete()
+            CheckAuthorization.revoke_deleted_user(user_id)
             
             return jsonify({"message": "User deleted successfully"}), 200
             
@@ -2,10 +2,12 @@ from flask import request, jsonify
 from Models.enquiryModel import Enquiry
 from Models.landModels import Land
 from Models.adminModels import Admin_And_User
-from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import current_principal
+from Utils.listing import GroupedListing
+from Utils.batchSerializer import BatchSerializer
+from Utils.dashboardStats import DashboardStats
+from Utils.jobQueue import JobQueue
 from datetime import datetime, timezone
-import jwt
-import os
 
 
 class EnquiryAdminController:
@@ -16,30 +18,22 @@ class EnquiryAdminController:
     
     @staticmethod
     def verify_admin():
-        """Helper method to verify admin authentication"""
-        token = request.headers.get('token')
-        if not token:
-            return None, (jsonify({"error": "Authentication required"}), 401)
+        """Helper method to verify admin authentication (returns the request principal)"""
+        principal, error = current_principal()
+        if error:
+            return None, error
         
-        verify = CheckAuthorization.VerifyToken(token)
-        if verify != True:
-            return None, verify
-        
-        # Decode token and check role
-        try:
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return None, (jsonify({"error": "Admin access required"}), 403)
-            return payload, None
-        except Exception as e:
-            return None, (jsonify({"error": "Token verification failed"}), 401)
+        if not principal.is_admin:
+            return None, (jsonify({"error": "Admin access required"}), 403)
+        return principal, None
     
     @staticmethod
     def get_all_enquiries():
         """
         Get all enquiries with optional filters
         GET /api/admin/enquiries/all
-        Query params: status?, enquiry_type?, user_id?, land_id?, start_date?, end_date?, is_followed_up?
+        Query params: status?, enquiry_type?, user_id?, land_id?, start_date?, end_date?, is_followed_up?,
+                      view?, page?, page_size?, include_total?
         """
         try:
             # Verify admin
@@ -47,6 +41,11 @@ class EnquiryAdminController:
             if error:
                 return error
             
+            try:
+                listing_params = GroupedListing.parse_params(request.args)
+            except ValueError as ve:
+                return jsonify({"error": str(ve)}), 400
+            
             # Build query filters
             filters = {}
             
@@ -90,26 +89,18 @@ class EnquiryAdminController:
             # Get enquiries with filters
             enquiries = Enquiry.objects(**filters).order_by('-created_at')
             
-            # Group by status
-            grouped = {
-                "pending": [],
-                "contacted": [],
-                "in_progress": [],
-                "completed": [],
-                "cancelled": []
-            }
-            
-            for enquiry in enquiries:
-                enquiry_json = enquiry.to_json()
-                grouped[enquiry.status].append(enquiry_json)
+            # Group by status and list in a single pass
+            data = GroupedListing.build(
+                enquiries,
+                groups=["pending", "contacted", "in_progress", "completed", "cancelled"],
+                list_key="enquiries",
+                serializer=BatchSerializer.enquiries,
+                **listing_params
+            )
             
             return jsonify({
                 "success": True,
-                "data": {
-                    "total": enquiries.count(),
-                    "grouped": grouped,
-                    "enquiries": [e.to_json() for e in enquiries]
-                }
+                "data": data
             }), 200
             
         except Exception as e:
@@ -132,7 +123,7 @@ class EnquiryAdminController:
             
             return jsonify({
                 "total": pending.count(),
-                "enquiries": [e.to_json() for e in pending]
+                "enquiries": BatchSerializer.enquiries(pending)
             }), 200
             
         except Exception as e:
@@ -426,50 +417,9 @@ class EnquiryAdminController:
             if error:
                 return error
             
-            # Get counts
-            total_enquiries = Enquiry.objects.count()
-            pending_enquiries = Enquiry.objects(status='pending').count()
-            contacted_enquiries = Enquiry.objects(status='contacted').count()
-            in_progress_enquiries = Enquiry.objects(status='in_progress').count()
-            completed_enquiries = Enquiry.objects(status='completed').count()
-            cancelled_enquiries = Enquiry.objects(status='cancelled').count()
-            
-            # Get counts by enquiry type
-            enquiry_type_stats = {}
-            for enq_type in ['buy_interest', 'site_visit', 'price_negotiation', 'general_enquiry']:
-                enquiry_type_stats[enq_type] = Enquiry.objects(enquiry_type=enq_type).count()
-            
-            # Follow-up stats
-            followed_up = Enquiry.objects(is_followed_up=True).count()
-            not_followed_up = Enquiry.objects(is_followed_up=False).count()
-            
-            # Get recent enquiries
-            recent_enquiries = Enquiry.objects().order_by('-created_at').limit(10)
-            recent_pending = Enquiry.objects(status='pending').order_by('-created_at').limit(5)
-            
-            # Get most enquired lands
-            from collections import Counter
-            land_ids = [str(e.land.id) for e in Enquiry.objects() if e.land]
-            most_enquired = Counter(land_ids).most_common(5)
-            
-            stats = {
-                "overview": {
-                    "total_enquiries": total_enquiries,
-                    "pending_enquiries": pending_enquiries,
-                    "contacted_enquiries": contacted_enquiries,
-                    "in_progress_enquiries": in_progress_enquiries,
-                    "completed_enquiries": completed_enquiries,
-                    "cancelled_enquiries": cancelled_enquiries
-                },
-                "by_enquiry_type": enquiry_type_stats,
-                "follow_up_stats": {
-                    "followed_up": followed_up,
-                    "not_followed_up": not_followed_up
-                },
-                "recent_enquiries": [e.to_json() for e in recent_enquiries],
-                "pending_enquiries": [e.to_json() for e in recent_pending],
-                "most_enquired_lands": [{"land_id": land_id, "count": count} for land_id, count in most_enquired]
-            }
+            # Counters come from the stats_counters document (kept current by the
+            # stats.reconcile job); only the top lands are grouped in the database
+            stats = DashboardStats.enquiry_stats()
             
             return jsonify(stats), 200
             
@@ -505,35 +455,18 @@ class EnquiryAdminController:
             if new_status not in valid_statuses:
                 return jsonify({"error": f"Status must be one of: {', '.join(valid_statuses)}"}), 400
             
-            # Update all enquiries
-            updated_count = 0
-            failed = []
-            
-            for enquiry_id in enquiry_ids:
-                try:
-                    enquiry = Enquiry.objects(id=enquiry_id).first()
-                    if enquiry:
-                        enquiry.status = new_status
-                        enquiry.updated_at = datetime.now(timezone.utc)
-                        
-                        if new_status == 'contacted' and not enquiry.contacted_at:
-                            enquiry.contacted_at = datetime.now(timezone.utc)
-                        elif new_status == 'completed' and not enquiry.completed_at:
-                            enquiry.completed_at = datetime.now(timezone.utc)
-                        
-                        enquiry.save()
-                        updated_count += 1
-                    else:
-                        failed.append({"id": enquiry_id, "reason": "Not found"})
-                except Exception as e:
-                    failed.append({"id": enquiry_id, "reason": str(e)})
+            # Apply the updates in the background; progress via GET /api/admin/jobs/<job_id>
+            job = JobQueue.enqueue(
+                'enquiries.bulk_update_status',
+                {"enquiry_ids": [str(i) for i in enquiry_ids], "status": new_status},
+                created_by=payload.user_id
+            )
             
             return jsonify({
-                "message": "Bulk status update completed",
-                "updated": updated_count,
-                "failed": len(failed),
-                "failed_details": failed
-            }), 200
+                "message": "Bulk status update queued",
+                "job_id": str(job.id),
+                "status": job.status
+            }), 202
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
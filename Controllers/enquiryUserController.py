@@ -1,11 +1,16 @@
-from flask import request, jsonify
+import logging
+from flask import request, jsonify, g
+from mongoengine.queryset.visitor import Q
+from pymongo.errors import OperationFailure
+from bson import ObjectId
 from Models.enquiryModel import Enquiry
 from Models.landModels import Land
-from Models.adminModels import Admin_And_User
-from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import require_user
+from Utils.pagination import CursorPagination
+from Utils.listing import GroupedListing
+from Utils.batchSerializer import BatchSerializer
+from Utils.httpCache import HttpCache, CollectionVersions
 from datetime import datetime, timezone
-import jwt
-import os
 
 
 class EnquiryUserController:
@@ -15,6 +20,7 @@ class EnquiryUserController:
     """
     
     @staticmethod
+    @require_user
     def create_enquiry():
         """
         Create a new enquiry for a land listing
@@ -22,21 +28,8 @@ class EnquiryUserController:
         Body: { land_id, enquiry_type, contact_name, contact_phone, contact_email, message?, budget?, preferred_contact_time? }
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
-            
-            # Get user
-            user = Admin_And_User.objects(id=user_id).first()
+            # Get user (resolved once per request)
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
@@ -109,77 +102,53 @@ class EnquiryUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def get_my_enquiries():
         """
         Get all enquiries by authenticated user
         GET /api/user/enquiries/my-enquiries
+        Query params: view?, page?, page_size?, include_total?
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            try:
+                listing_params = GroupedListing.parse_params(request.args)
+            except ValueError as ve:
+                return jsonify({"error": str(ve)}), 400
             
-            # Get user
-            user = Admin_And_User.objects(id=user_id).first()
+            # Get user (resolved once per request)
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
             # Get all enquiries by this user
             enquiries = Enquiry.objects(user=user).order_by('-created_at')
             
-            # Group by status
-            grouped = {
-                "pending": [],
-                "contacted": [],
-                "in_progress": [],
-                "completed": [],
-                "cancelled": []
-            }
-            
-            for enquiry in enquiries:
-                enquiry_json = enquiry.to_json()
-                grouped[enquiry.status].append(enquiry_json)
+            # Group by status and list in a single pass
+            data = GroupedListing.build(
+                enquiries,
+                groups=["pending", "contacted", "in_progress", "completed", "cancelled"],
+                list_key="enquiries",
+                serializer=BatchSerializer.enquiries,
+                **listing_params
+            )
             
             return jsonify({
                 "success": True,
-                "data": {
-                    "total": enquiries.count(),
-                    "grouped": grouped,
-                    "enquiries": [e.to_json() for e in enquiries]
-                }
+                "data": data
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def get_enquiry_by_id():
         """
         Get a specific enquiry by ID (user can only view their own)
         GET /api/user/enquiries/enquiry?id=<enquiry_id>
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get enquiry ID
             enquiry_id = request.args.get('id')
@@ -201,6 +170,7 @@ class EnquiryUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def update_enquiry():
         """
         Update user's own pending enquiry
@@ -208,18 +178,7 @@ class EnquiryUserController:
         Body: { contact_name?, contact_phone?, contact_email?, message?, budget?, preferred_contact_time? }
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get enquiry ID
             enquiry_id = request.args.get('id')
@@ -272,24 +231,14 @@ class EnquiryUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def cancel_enquiry():
         """
         Cancel user's own enquiry
         PUT /api/user/enquiries/cancel?id=<enquiry_id>
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get enquiry ID
             enquiry_id = request.args.get('id')
@@ -397,22 +346,44 @@ class EnquiryUserController:
     @staticmethod
     def get_available_lands():
         """
-        Get all available lands for browsing (public endpoint for authenticated users)
+        Get available lands for browsing, one page at a time (public endpoint)
         GET /api/user/enquiries/available-lands
-        Query params: property_type?, location?, min_price?, max_price?, min_size?, max_size?, search?
+        Query params: property_type?, location?, min_price?, max_price?, min_size?, max_size?, search?,
+                      limit? (default 20, max 100), cursor?, include_total?
         """
         try:
+            # Any land or owner write changes the version stamps; same stamps + same query = same page
+            stamps = CollectionVersions.stamps('lands', 'users')
+            etag = HttpCache.etag(
+                'available-lands',
+                HttpCache.stamp(stamps.get('lands')),
+                HttpCache.stamp(stamps.get('users')),
+                sorted(request.args.items(multi=True))
+            )
+            last_modified = HttpCache.latest(*(doc.get('updated_at') for doc in stamps.values()))
+            cached = HttpCache.not_modified(etag, last_modified, HttpCache.LAND_LIST)
+            if cached:
+                return cached
+
+            # Pagination params
+            try:
+                limit = CursorPagination.parse_limit(request.args.get('limit'))
+            except ValueError:
+                return jsonify({"error": "limit must be a positive integer"}), 400
+            cursor = request.args.get('cursor')
+            include_total = (request.args.get('include_total') or '').lower() in ['true', '1', 'yes']
+            
             # Build query filters
             filters = {'status': 'available'}
             
             # Log incoming parameters for debugging
-            print(f"Received query params: {dict(request.args)}")
+            logging.debug(f"Received query params: {dict(request.args)}")
             
             # Property type filter
             property_type = request.args.get('property_type')
             if property_type and property_type != '':
                 filters['property_type'] = property_type
-                print(f"Applied property_type filter: {property_type}")
+                logging.debug(f"Applied property_type filter: {property_type}")
             
             # Location filter (case-insensitive partial match)
             location = request.args.get('location')
@@ -435,27 +406,47 @@ class EnquiryUserController:
             if max_size:
                 filters['size__lte'] = int(max_size)
             
-            # Search parameter (searches across title, location, description)
-            search = request.args.get('search')
-            if search:
-                from mongoengine import Q
-                search_query = Q(title__icontains=search) | Q(location__icontains=search) | Q(description__icontains=search)
-                lands = Land.objects(search_query, **filters)
-            else:
-                # Get lands with filters
-                lands = Land.objects(**filters)
+            # Search parameter: relevance-ranked text search over title, location,
+            # address and description (text index on Land)
+            search = (request.args.get('search') or '').strip()
+            lands = Land.objects(**filters)
             
-            # Order by created date
-            lands = lands.order_by('-created_at')
+            # Log final filters
+            logging.debug(f"Applied filters: {filters}")
             
-            # Log final results
-            print(f"Applied filters: {filters}")
-            print(f"Found {lands.count()} lands")
+            try:
+                if search:
+                    try:
+                        lands = Land.objects(**filters).search_text(search).order_by('$text_score')
+                        page, next_cursor = CursorPagination.paginate_ranked(lands, cursor=cursor, limit=limit)
+                    except OperationFailure:
+                        # Text index not built yet: unranked substring match
+                        logging.warning("Land text index unavailable, falling back to substring search")
+                        lands = Land.objects(
+                            Q(title__icontains=search) | Q(location__icontains=search) |
+                            Q(address__icontains=search) | Q(description__icontains=search),
+                            **filters
+                        ).order_by('-created_at', '-id')
+                        page, next_cursor = CursorPagination.paginate_ranked(lands, cursor=cursor, limit=limit)
+                else:
+                    # Keyset page ordered by created date (newest first)
+                    page, next_cursor = CursorPagination.paginate(lands, cursor=cursor, limit=limit)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            
+            response = {
+                "lands": BatchSerializer.lands(page),
+                "count": len(page),
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
             
-            return jsonify({
-                "total": lands.count(),
-                "lands": [land.to_json() for land in lands]
-            }), 200
+            # Counting scans every match, so only do it when asked
+            if include_total:
+                response["total"] = lands.count()
+            
+            return jsonify(response), 200, HttpCache.headers(etag, last_modified, HttpCache.LAND_LIST)
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -467,9 +458,24 @@ class EnquiryUserController:
         GET /api/user/enquiries/land/<land_id>
         """
         try:
+            if not ObjectId.is_valid(land_id):
+                return jsonify({"error": "Land not found"}), 404
+            
+            # Any land or owner write changes the version stamps, so a revalidation
+            # is answered from one collection_versions read, before the land is loaded
+            stamps = CollectionVersions.stamps('lands', 'users')
+            etag = HttpCache.etag(
+                'land', land_id, HttpCache.stamp(stamps.get('lands')), HttpCache.stamp(stamps.get('users'))
+            )
+            last_modified = HttpCache.latest(*(doc.get('updated_at') for doc in stamps.values()))
+            # (an ETag is only ever issued with a 200 for this land; '*' is checked after the load)
+            if request.if_none_match and not request.if_none_match.star_tag:
+                cached = HttpCache.not_modified(etag, last_modified, HttpCache.LAND_DETAIL)
+                if cached:
+                    return cached
+            
             # Get land by ID
             land = Land.objects(id=land_id).first()
-            
             if not land:
                 return jsonify({"error": "Land not found"}), 404
             
@@ -477,10 +483,15 @@ class EnquiryUserController:
             if land.status != 'available':
                 return jsonify({"error": "Land not available"}), 404
             
+            # If-Modified-Since alone is only honoured for a land that exists and is public
+            cached = HttpCache.not_modified(etag, last_modified, HttpCache.LAND_DETAIL)
+            if cached:
+                return cached
+            
             return jsonify({
                 "success": True,
-                "land": land.to_json()
-            }), 200
+                "land": BatchSerializer.land(land)
+            }), 200, HttpCache.headers(etag, last_modified, HttpCache.LAND_DETAIL)
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -1,16 +1,27 @@
-from flask import request, jsonify
+from flask import request, jsonify, g
+from bson import ObjectId
+from werkzeug.exceptions import RequestEntityTooLarge
+from Utils.uploadStream import ImageSniffer
+from Utils.imageStorage import get_storage
+from Utils.imageAssets import ImageAssets
 from Utils.cloudinaryUpload import CloudinaryUpload
-from Utils.CheckAuthorization import CheckAuthorization
-import jwt
-import os
+from Utils.directUpload import DirectUpload, DirectUploadError
+from Utils.uploadStream import UPLOAD_MAX_FILE_BYTES
+from Utils.resilience import DependencyUnavailable
+from Utils.imageGc import ImageGc
+from Utils.jobQueue import JobQueue
+from datetime import datetime, timezone
+from Models.landModels import Land
+from Utils.authContext import require_admin
 
 
 class ImageUploadController:
     """
-    Controller for handling image uploads to Cloudinary
+    Controller for handling land image uploads (Cloudinary or local storage, see Utils.imageStorage)
     """
     
     @staticmethod
+    @require_admin
     def upload_land_images():
         """
         Upload multiple land images to Cloudinary
@@ -19,20 +30,6 @@ class ImageUploadController:
         Body: multipart/form-data with 'images' field containing files
         """
         try:
-            # Check admin authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token and check role
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return jsonify({"error": "Admin access required"}), 403
-            
             # Check if files are present
             if 'images' not in request.files:
                 return jsonify({"error": "No images provided"}), 400
@@ -56,45 +53,57 @@ class ImageUploadController:
                 if ext not in allowed_extensions:
                     return jsonify({"error": f"Invalid file type: {file.filename}. Allowed: {', '.join(allowed_extensions)}"}), 400
             
-            # Upload images to Cloudinary
-            uploaded_images = CloudinaryUpload.upload_multiple_images(files, folder="gem_lands")
+            # Check the actual content (magic bytes) before anything is sent to Cloudinary
+            infos = [ImageSniffer.inspect(file) for file in files]
+            for file, info in zip(files, infos):
+                if info['size'] == 0:
+                    return jsonify({"error": f"Empty file: {file.filename}"}), 400
+                if info['format'] is None:
+                    return jsonify({"error": f"{file.filename} is not a valid JPEG, PNG, GIF or WEBP image"}), 400
+            
+            # Upload images to the storage backend (in parallel, per-file results in input order);
+            # content already stored is answered from the image registry without re-uploading
+            results = ImageAssets.upload(files, infos, folder="gem_lands")
+            uploaded_images = [r for r in results if r['success']]
+            failed = [
+                {"index": r['index'], "filename": r['filename'], "error": r['error']}
+                for r in results if not r['success']
+            ]
+            
+            if not uploaded_images:
+                unavailable = [r['retry_after'] for r in results if r.get('retry_after')]
+                if unavailable:
+                    # Storage provider degraded (breaker open / deadline hit): tell the client when to retry
+                    return jsonify({"error": "Image storage is temporarily unavailable", "failed": failed}), \
+                        503, {"Retry-After": str(max(unavailable))}
+                return jsonify({"error": "Failed to upload images", "failed": failed}), 500
             
             # Extract URLs
             image_urls = [img['url'] for img in uploaded_images]
             
             return jsonify({
-                "message": "Images uploaded successfully",
+                "message": "Images uploaded successfully" if not failed else "Some images failed to upload",
                 "images": uploaded_images,
                 "image_urls": image_urls,
-                "count": len(image_urls)
+                "count": len(image_urls),
+                "failed": failed
             }), 200
             
+        except RequestEntityTooLarge as e:
+            return jsonify({"error": e.description}), 413
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_admin
     def delete_land_image():
         """
-        Delete a land image from Cloudinary
+        Delete a land image from storage
         DELETE /api/admin/images/delete-land-image
         Requires: Admin authentication
         Body: { "image_url": "cloudinary_url" } or { "public_id": "cloudinary_public_id" }
         """
         try:
-            # Check admin authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token and check role
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return jsonify({"error": "Admin access required"}), 403
-            
             # Get request data
             data = request.get_json()
             if not data:
@@ -107,12 +116,16 @@ class ImageUploadController:
             if not public_id and not image_url:
                 return jsonify({"error": "Either public_id or image_url is required"}), 400
             
+            storage = get_storage()
+            
             # Extract public_id from URL if not provided
             if not public_id and image_url:
-                public_id = CloudinaryUpload.extract_public_id_from_url(image_url)
+                public_id = storage.public_id_from_url(image_url)
+                if not public_id:
+                    return jsonify({"error": "Unrecognised image URL"}), 400
             
-            # Delete image from Cloudinary
-            result = CloudinaryUpload.delete_image(public_id)
+            # Delete image from storage
+            result = storage.delete(public_id)
             
             return jsonify({
                 "message": "Image deleted successfully",
@@ -123,28 +136,15 @@ class ImageUploadController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_admin
     def delete_multiple_land_images():
         """
-        Delete multiple land images from Cloudinary
+        Delete multiple land images from storage
         DELETE /api/admin/images/delete-multiple-land-images
         Requires: Admin authentication
         Body: { "image_urls": ["url1", "url2"] } or { "public_ids": ["id1", "id2"] }
         """
         try:
-            # Check admin authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token and check role
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return jsonify({"error": "Admin access required"}), 403
-            
             # Get request data
             data = request.get_json()
             if not data:
@@ -157,18 +157,147 @@ class ImageUploadController:
             if not public_ids and not image_urls:
                 return jsonify({"error": "Either public_ids or image_urls is required"}), 400
             
-            # Extract public_ids from URLs if not provided
-            if not public_ids and image_urls:
-                public_ids = [CloudinaryUpload.extract_public_id_from_url(url) for url in image_urls]
+            storage = get_storage()
             
-            # Delete images from Cloudinary
-            results = CloudinaryUpload.delete_multiple_images(public_ids)
+            # Delete images from storage (bulk calls, per-id or per-url results)
+            if public_ids:
+                results = storage.bulk_delete(public_ids)
+            else:
+                results = storage.delete_urls(image_urls)
+            failed = [pid for pid, res in results.items() if res['result'] == 'error']
             
             return jsonify({
-                "message": "Images deleted successfully",
+                "message": "Images deleted successfully" if not failed else "Some images could not be deleted",
                 "results": results,
-                "count": len(results)
+                "count": sum(1 for res in results.values() if res['result'] in ('deleted', 'not_found')),
+                "failed": failed
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+    @staticmethod
+    @require_admin
+    def sign_direct_upload():
+        """
+        Issue signed parameters for uploading one image straight to Cloudinary
+        POST /api/admin/images/direct-upload/sign
+        Requires: Admin authentication
+        Body: { "land_id": "optional land to attach the image to" }
+
+        The server never sees the bytes, so direct uploads are not deduplicated:
+        a client-supplied hash cannot be trusted to name the content.
+        """
+        try:
+            if not get_storage().direct_upload:
+                return jsonify({"error": "Direct uploads are not supported by the configured image storage"}), 501
+
+            data = request.get_json() or {}
+            land_id = data.get('land_id')
+            if land_id and (not ObjectId.is_valid(land_id) or not Land.objects(id=land_id).only('id').first()):
+                return jsonify({"error": "Land not found"}), 404
+
+            upload = DirectUpload.sign(g.principal.user_id, land_id=land_id)
+            return jsonify(upload), 200
+
+        except DirectUploadError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @staticmethod
+    @require_admin
+    def confirm_direct_upload():
+        """
+        Register an image uploaded with sign_direct_upload parameters
+        POST /api/admin/images/direct-upload/confirm
+        Requires: Admin authentication
+        Body: { "upload_token": "...", "public_id": "...", "version": 123, "signature": "..." }
+              (public_id, version and signature as returned by Cloudinary's upload response)
+        """
+        try:
+            data = request.get_json() or {}
+            claims = DirectUpload.verify_token(data.get('upload_token'), g.principal.user_id)
+            DirectUpload.verify_upload_result(claims, data.get('public_id'), data.get('version'), data.get('signature'))
+
+            # Size and format as stored by Cloudinary, not as reported by the client
+            resource = CloudinaryUpload.get_resource(claims['pid'])
+            if resource.get('bytes', 0) > UPLOAD_MAX_FILE_BYTES or resource.get('format') not in DirectUpload.ALLOWED_FORMATS:
+                get_storage().delete(claims['pid'])
+                return jsonify({"error": "Uploaded file exceeds the size limit or is not an allowed image type"}), 400
+
+            result = {
+                'url': resource.get('secure_url'),
+                'public_id': claims['pid'],
+                'width': resource.get('width'),
+                'height': resource.get('height'),
+                'format': resource.get('format')
+            }
+            # Registered for reference counting only (no verified content hash)
+            asset = ImageAssets.register(None, result, resource.get('bytes'))
+            image = asset.to_upload_result()
+
+            land_id = claims.get('land')
+            if land_id and not ImageUploadController._attach(land_id, image['url']):
+                return jsonify({"error": "Land not found", "image": image}), 404
+
+            return jsonify({
+                "message": "Image registered successfully",
+                "image": image,
+                "land_id": land_id
+            }), 200
+
+        except DirectUploadError as e:
+            return jsonify({"error": str(e)}), 400
+        except DependencyUnavailable as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @staticmethod
+    @require_admin
+    def collect_garbage():
+        """
+        Queue a garbage collection run over stored land images
+        POST /api/admin/images/gc
+        Requires: Admin authentication
+        Body: { "dry_run": true (default; report only), "grace_hours": 24 }
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            dry_run = data.get('dry_run', True) is not False
+            try:
+                grace_hours = float(data.get('grace_hours', ImageGc.GRACE_HOURS))
+            except (TypeError, ValueError):
+                return jsonify({"error": "grace_hours must be a number"}), 400
+            # Never touch uploads that may still be on their way to a land
+            if grace_hours < 1:
+                return jsonify({"error": "grace_hours must be at least 1"}), 400
+
+            job = JobQueue.enqueue_once('images.gc', {
+                "dry_run": dry_run,
+                "grace_hours": grace_hours,
+                "folder": "gem_lands",
+                "started_at": datetime.now(timezone.utc).isoformat()
+            })
+            if job.payload.get('dry_run') != dry_run:
+                return jsonify({"error": "Another image GC run is in progress", "job_id": str(job.id)}), 409
+
+            return jsonify({
+                "message": "Image GC queued" + (" (dry run)" if dry_run else ""),
+                "job_id": str(job.id)
+            }), 202
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @staticmethod
+    def _attach(land_id, url):
+        """Append an image to a land (saved through the document so image refcounts follow); False if no land"""
+        land = Land.objects(id=land_id).first()
+        if not land:
+            return False
+        if url not in (land.images_urls or []):
+            land.images_urls = list(land.images_urls or []) + [url]
+            land.save()
+        return True
@@ -0,0 +1,30 @@
+from flask import jsonify
+from bson import ObjectId
+from Models.jobModel import Job
+from Utils.authContext import require_admin
+
+
+class JobController:
+    """
+    Status of background jobs queued by admin actions
+    """
+
+    @staticmethod
+    @require_admin
+    def get_job(job_id):
+        """
+        Get the status and result of a background job
+        GET /api/admin/jobs/<job_id>
+        """
+        try:
+            if not ObjectId.is_valid(job_id):
+                return jsonify({"error": "Invalid job ID"}), 400
+
+            job = Job.objects(id=job_id).first()
+            if not job:
+                return jsonify({"error": "Job not found"}), 404
+
+            return jsonify({"job": job.to_json()}), 200
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
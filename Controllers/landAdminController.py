@@ -1,30 +1,24 @@
 from Models.landModels import Land
-from Models.adminModels import Admin_And_User
 from flask import request, jsonify
-from datetime import datetime
-from Utils.CheckAuthorization import CheckAuthorization
-from Utils.cloudinaryUpload import CloudinaryUpload
-import jwt
-import os
+from datetime import datetime, timezone
+from Utils.authContext import current_principal
+from Utils.jobQueue import JobQueue
+from Utils.listing import GroupedListing
+from Utils.batchSerializer import BatchSerializer
+from Utils.dashboardStats import DashboardStats
 
 class LandAdminController:
     
     @staticmethod
     def verify_admin():
-        """Verify if user is admin"""
-        token = request.headers.get('token')
-        if not token:
-            return None, (jsonify({"success": False, "error": "Token required"}), 401)
+        """Verify if user is admin (returns the request principal)"""
+        principal, error = current_principal(envelope=True)
+        if error:
+            return None, error
         
-        try:
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return None, (jsonify({"success": False, "error": "Admin access required"}), 403)
-            return payload, None
-        except jwt.ExpiredSignatureError:
-            return None, (jsonify({"success": False, "error": "Token expired"}), 401)
-        except jwt.InvalidTokenError:
-            return None, (jsonify({"success": False, "error": "Invalid token"}), 401)
+        if not principal.is_admin:
+            return None, (jsonify({"success": False, "error": "Admin access required"}), 403)
+        return principal, None
     
     @staticmethod
     def create_land():
@@ -61,7 +55,7 @@ class LandAdminController:
                 return jsonify({"success": False, "error": f"property_type must be one of: {', '.join(property_type_map.keys())}"}), 400
             
             # Get admin user
-            admin_user = Admin_And_User.objects(id=payload['user_id']).first()
+            admin_user = payload.user
             if not admin_user:
                 return jsonify({"success": False, "error": "Admin user not found"}), 404
             
@@ -142,7 +136,7 @@ class LandAdminController:
             return jsonify({
                 "success": True,
                 "message": "Land created successfully",
-                "data": {"land": land.to_json()}
+                "data": {"land": BatchSerializer.land(land)}
             }), 201
             
         except ValueError as ve:
@@ -155,6 +149,7 @@ class LandAdminController:
         """
         Get all lands with optional filters
         GET /api/admin/lands/all
+        Query params: status?, property_type?, view?, page?, page_size?, include_total?
         """
         try:
             # Verify admin
@@ -162,6 +157,11 @@ class LandAdminController:
             if error:
                 return error
             
+            try:
+                listing_params = GroupedListing.parse_params(request.args)
+            except ValueError as ve:
+                return jsonify({"success": False, "error": str(ve)}), 400
+            
             # Build query filters
             filters = {}
             
@@ -178,25 +178,18 @@ class LandAdminController:
             # Get lands with filters
             lands = Land.objects(**filters).order_by('-created_at')
             
-            # Group by status
-            grouped = {
-                "available": [],
-                "sold": [],
-                "pending": [],
-                "rejected": []
-            }
-            
-            for land in lands:
-                land_json = land.to_json()
-                grouped[land.status].append(land_json)
+            # Group by status and list in a single pass
+            data = GroupedListing.build(
+                lands,
+                groups=["available", "sold", "pending", "rejected"],
+                list_key="lands",
+                serializer=BatchSerializer.lands,
+                **listing_params
+            )
             
             return jsonify({
                 "success": True,
-                "data": {
-                    "total": lands.count(),
-                    "grouped": grouped,
-                    "lands": [land.to_json() for land in lands]
-                }
+                "data": data
             }), 200
             
         except Exception as e:
@@ -240,7 +233,7 @@ class LandAdminController:
             return jsonify({
                 "success": True,
                 "message": f"Land status updated to {new_status}",
-                "data": {"land": land.to_json()}
+                "data": {"land": BatchSerializer.land(land)}
             }), 200
             
         except Exception as e:
@@ -366,7 +359,7 @@ class LandAdminController:
             return jsonify({
                 "success": True,
                 "message": "Land updated successfully",
-                "data": {"land": land.to_json()}
+                "data": {"land": BatchSerializer.land(land)}
             }), 200
             
         except Exception as e:
@@ -393,36 +386,38 @@ class LandAdminController:
             if not land:
                 return jsonify({"success": False, "error": "Land not found"}), 404
             
-            # Attempt to delete Cloudinary images first (best-effort)
-            deleted_images = []
-            failed_images = []
-            try:
-                for url in land.images_urls or []:
-                    try:
-                        res = CloudinaryUpload.delete_image_by_url(url)
-                        # Cloudinary returns {'result': 'ok'} on success, 'not found' if already gone
-                        if isinstance(res, dict) and res.get('result') in ['ok', 'not found']:
-                            deleted_images.append(url)
-                        else:
-                            failed_images.append({"url": url, "response": res})
-                    except Exception as ex:
-                        failed_images.append({"url": url, "error": str(ex)})
-            except Exception:
-                # Continue even if bulk deletion loop had unexpected error
-                pass
-
+            image_urls = list(land.images_urls or [])
+            
             # Delete land record
             land.delete()
             
+            if not image_urls:
+                return jsonify({
+                    "success": True,
+                    "message": "Land deleted successfully",
+                    "data": {"deleted_images_count": 0}
+                }), 200
+            
+            # Cloudinary cleanup runs in the background (retried until the images are gone);
+            # images still used by other lands are kept
+            job = JobQueue.enqueue(
+                'land_images.delete',
+                {
+                    "land_id": str(land_id),
+                    "image_urls": image_urls,
+                    "released_at": datetime.now(timezone.utc).isoformat()
+                },
+                created_by=payload.user_id
+            )
+            
             return jsonify({
                 "success": True,
-                "message": "Land deleted successfully",
+                "message": "Land deleted successfully, image cleanup queued",
                 "data": {
-                    "deleted_images_count": len(deleted_images),
-                    "failed_images_count": len(failed_images),
-                    "failed_images": failed_images[:5]  # cap to avoid huge payloads
+                    "image_cleanup_job_id": str(job.id),
+                    "images_count": len(image_urls)
                 }
-            }), 200
+            }), 202
             
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
@@ -439,25 +434,19 @@ class LandAdminController:
             if error:
                 return error
             
-            # Get statistics
-            total_lands = Land.objects().count()
-            available_lands = Land.objects(status='available').count()
-            sold_lands = Land.objects(status='sold').count()
-            pending_lands = Land.objects(status='pending').count()
-            rejected_lands = Land.objects(status='rejected').count()
-            
-            # Get recent lands
-            recent_lands = Land.objects().order_by('-created_at').limit(5)
+            # Status counters are read from the stats_counters document
+            land_stats = DashboardStats.land_stats(recent=5)
+            by_status = land_stats['by_status']
             
             stats = {
                 "overview": {
-                    "total_lands": total_lands,
-                    "available_lands": available_lands,
-                    "sold_lands": sold_lands,
-                    "pending_lands": pending_lands,
-                    "rejected_lands": rejected_lands
+                    "total_lands": land_stats['total'],
+                    "available_lands": by_status['available'],
+                    "sold_lands": by_status['sold'],
+                    "pending_lands": by_status['pending'],
+                    "rejected_lands": by_status['rejected']
                 },
-                "recent_lands": [land.to_json() for land in recent_lands]
+                "recent_lands": land_stats['recent']
             }
             
             return jsonify({
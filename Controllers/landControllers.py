@@ -1,33 +1,21 @@
-from flask import request, jsonify
+from flask import request, jsonify, g
 from Models.landModels import Land
-from Models.adminModels import Admin_And_User
-import jwt
-import os
+from Utils.authContext import require_user
+from Utils.batchSerializer import BatchSerializer
 from datetime import datetime
 
 class LandController:
+    @require_user
     def create_land():
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            principal = g.principal
             
             data = request.get_json()
             if not data:
                 return jsonify({"error": "No data provided"}), 400
             
             # Get the user
-            user = Admin_And_User.objects(id=user_id).first()
+            user = principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
@@ -47,7 +35,7 @@ class LandController:
             
             return jsonify({
                 "message": "Land created successfully and pending approval",
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 201
             
         except Exception as e:
@@ -62,26 +50,16 @@ class LandController:
             else:
                 lands = Land.objects(**query)
             
-            return jsonify([land.to_json() for land in lands]), 200
+            return jsonify(BatchSerializer.lands(lands)), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def update_land():
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            principal = g.principal
+            user_id = principal.user_id
             
             land_id = request.args.get('id')
             if not land_id:
@@ -94,7 +72,7 @@ class LandController:
                 return jsonify({"error": "Land not found"}), 404
             
             # Check if user owns this land or is admin
-            if str(land.user.id) != user_id and payload.get('role') != 'admin':
+            if str(land.user.id) != user_id and not principal.is_admin:
                 return jsonify({"error": "Unauthorized to update this land"}), 403
             
             # Update land fields
@@ -107,27 +85,17 @@ class LandController:
             
             return jsonify({
                 "message": "Land updated successfully",
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def delete_land():
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 400
+            principal = g.principal
+            user_id = principal.user_id
             
             land_id = request.args.get('id')
             if not land_id:
@@ -138,7 +106,7 @@ class LandController:
                 return jsonify({"error": "Land not found"}), 404
             
             # Check if user owns this land or is admin
-            if str(land.user.id) != user_id and payload.get('role') != 'admin':
+            if str(land.user.id) != user_id and not principal.is_admin:
                 return jsonify({"error": "Unauthorized to delete this land"}), 403
             
             land.delete()
@@ -1,10 +1,9 @@
 from Models.adminModels import Admin_And_User
-from flask import request, jsonify
-from datetime import datetime, timedelta
-from werkzeug.security import check_password_hash
-import jwt
-import os
+from flask import request, jsonify, g
 from mongoengine.queryset.visitor import Q
+from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import require_user
+from Utils.passwordHasher import PasswordHasher, PasswordHasherBusy, LoginThrottle
 
 class LoginController:
     def login():
@@ -17,30 +16,35 @@ class LoginController:
             if not identifier or not password:
                 return jsonify({"error": "Email or mobile and password are required"}), 400
             
+            # Too many recent failures for this identifier
+            retry_after = LoginThrottle.retry_after(identifier)
+            if retry_after:
+                return jsonify({"error": "Too many login attempts, please try again later"}), 429, {"Retry-After": str(retry_after)}
+            
             # Find user by email OR phone only
             user = Admin_And_User.objects(
                 Q(email=identifier) | Q(phone=identifier)
             ).first()
             if not user:
+                LoginThrottle.record_failure(identifier)
                 return jsonify({"error": "Invalid credentials"}), 401
             
             # Check password
-            if not check_password_hash(user.password, password):
+            if not PasswordHasher.verify(user.password, password):
+                LoginThrottle.record_failure(identifier)
                 return jsonify({"error": "Invalid credentials"}), 401
+            LoginThrottle.reset(identifier)
             
-            # Generate JWT token
-            payload = {
-                "user_id": str(user.id),
-                "username": user.username,
-                "role": user.role,
-                "exp": datetime.utcnow() + timedelta(minutes=int(os.getenv("JWT_EXPIRATION_MINUTES", 60)))
-            }
-            
-            token = jwt.encode(payload, os.getenv("JWT_SECRET"), algorithm=os.getenv("JWT_ALGORITHM", "HS256"))
+            # Upgrade hashes made with older cost parameters while the plain password is at hand
+            if PasswordHasher.needs_rehash(user.password):
+                try:
+                    user.password = PasswordHasher.hash(password)
+                    user.save()
+                except PasswordHasherBusy:
+                    pass
             
-            # Update user's auth_token
-            user.auth_token = token
-            user.save()
+            # Generate JWT token bound to the current token version; other sessions stay valid
+            token = CheckAuthorization.create_token(user)
             
             return jsonify({
                 "message": "Login successful",
@@ -55,6 +59,8 @@ class LoginController:
                 }
             }), 200
             
+        except PasswordHasherBusy as busy:
+            return jsonify({"error": str(busy)}), 503, {"Retry-After": str(busy.retry_after)}
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -68,21 +74,42 @@ class LoginController:
             if not username or not old_password or not new_password:
                 return jsonify({"error": "Username, old password, and new password are required"}), 400
             
+            retry_after = LoginThrottle.retry_after(username)
+            if retry_after:
+                return jsonify({"error": "Too many attempts, please try again later"}), 429, {"Retry-After": str(retry_after)}
+            
             # Find user by username
             user = Admin_And_User.objects(username=username).first()
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
             # Check old password
-            if not check_password_hash(user.password, old_password):
+            if not PasswordHasher.verify(user.password, old_password):
+                LoginThrottle.record_failure(username)
                 return jsonify({"error": "Invalid old password"}), 401
+            LoginThrottle.reset(username)
             
-            # Update password
-            from werkzeug.security import generate_password_hash
-            user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+            # Update password and sign out every existing session
+            user.password = PasswordHasher.hash(new_password)
             user.save()
+            CheckAuthorization.revoke_tokens(user.id)
             
             return jsonify({"message": "Password changed successfully"}), 200
             
+        except PasswordHasherBusy as busy:
+            return jsonify({"error": str(busy)}), 503, {"Retry-After": str(busy.retry_after)}
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @require_user
+    def logout():
+        """
+        Revoke every token of the signed-in user (all devices)
+        POST /api/login/logout
+        """
+        try:
+            CheckAuthorization.revoke_tokens(g.principal.user_id)
+            return jsonify({"message": "Logged out successfully"}), 200
+            
         except Exception as e:
             return jsonify({"error": str(e)}), 500
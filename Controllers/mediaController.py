@@ -0,0 +1,26 @@
+from flask import send_from_directory, jsonify
+from Utils.imageStorage import get_storage
+
+
+class MediaController:
+    """
+    Serves images stored by the local storage backend (IMAGE_STORAGE_BACKEND=local)
+    """
+
+    # Stored files never change under the same path, so clients may cache them for a year
+    MAX_AGE = 365 * 24 * 3600
+
+    @staticmethod
+    def serve(path):
+        """
+        GET <IMAGE_STORAGE_LOCAL_URL path>/<public_id>/<variant>.<jpg|webp>
+
+        Only generated variants are served; the uploaded original keeps its metadata.
+        """
+        storage = get_storage()
+        if storage.name != 'local' or not storage.variant_file(path):
+            return jsonify({"error": "Not found"}), 404
+
+        response = send_from_directory(storage.root, path, max_age=MediaController.MAX_AGE)
+        response.headers['Cache-Control'] = f"public, max-age={MediaController.MAX_AGE}, immutable"
+        return response
@@ -0,0 +1,21 @@
+from flask import jsonify
+from Utils.authContext import require_admin
+from Utils.resilience import Resilience
+
+
+class MetricsController:
+    """
+    Runtime metrics of this worker process
+    """
+
+    @staticmethod
+    @require_admin
+    def get_dependency_metrics():
+        """
+        Circuit breaker state, call counts and latency of each external dependency
+        GET /api/admin/metrics/dependencies
+        """
+        try:
+            return jsonify({"dependencies": Resilience.metrics()}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
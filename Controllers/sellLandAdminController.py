@@ -2,10 +2,12 @@ from flask import request, jsonify
 from Models.sellLandModel import SellLandSubmission
 from Models.landModels import Land
 from Models.adminModels import Admin_And_User
-from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import current_principal
+from Utils.listing import GroupedListing
+from Utils.batchSerializer import BatchSerializer
+from Utils.dashboardStats import DashboardStats
+from Utils.jobQueue import JobQueue
 from datetime import datetime, timezone
-import jwt
-import os
 
 
 class SellLandAdminController:
@@ -16,30 +18,21 @@ class SellLandAdminController:
     
     @staticmethod
     def verify_admin():
-        """Helper method to verify admin authentication"""
-        token = request.headers.get('token')
-        if not token:
-            return None, (jsonify({"error": "Authentication required"}), 401)
+        """Helper method to verify admin authentication (returns the request principal)"""
+        principal, error = current_principal()
+        if error:
+            return None, error
         
-        verify = CheckAuthorization.VerifyToken(token)
-        if verify != True:
-            return None, verify
-        
-        # Decode token and check role
-        try:
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return None, (jsonify({"error": "Admin access required"}), 403)
-            return payload, None
-        except Exception as e:
-            return None, (jsonify({"error": "Token verification failed"}), 401)
+        if not principal.is_admin:
+            return None, (jsonify({"error": "Admin access required"}), 403)
+        return principal, None
     
     @staticmethod
     def get_all_submissions():
         """
         Get all sell land submissions with optional filters
         GET /api/admin/sell-land/all
-        Query params: status?, land_type?, user_id?, start_date?, end_date?
+        Query params: status?, land_type?, user_id?, start_date?, end_date?, view?, page?, page_size?, include_total?
         """
         try:
             # Verify admin
@@ -47,6 +40,11 @@ class SellLandAdminController:
             if error:
                 return error
             
+            try:
+                listing_params = GroupedListing.parse_params(request.args)
+            except ValueError as ve:
+                return jsonify({"error": str(ve)}), 400
+            
             # Build query filters
             filters = {}
             
@@ -78,25 +76,18 @@ class SellLandAdminController:
             # Get submissions with filters
             submissions = SellLandSubmission.objects(**filters).order_by('-created_at')
             
-            # Group by status
-            grouped = {
-                "pending": [],
-                "approved": [],
-                "rejected": [],
-                "moved_to_land": []
-            }
-            
-            for submission in submissions:
-                submission_json = submission.to_json()
-                grouped[submission.status].append(submission_json)
+            # Group by status and list in a single pass
+            data = GroupedListing.build(
+                submissions,
+                groups=["pending", "approved", "rejected", "moved_to_land"],
+                list_key="submissions",
+                serializer=BatchSerializer.submissions,
+                **listing_params
+            )
             
             return jsonify({
                 "success": True,
-                "data": {
-                    "total": submissions.count(),
-                    "grouped": grouped,
-                    "submissions": [s.to_json() for s in submissions]
-                }
+                "data": data
             }), 200
             
         except Exception as e:
@@ -119,7 +110,7 @@ class SellLandAdminController:
             
             return jsonify({
                 "total": pending.count(),
-                "submissions": [s.to_json() for s in pending]
+                "submissions": BatchSerializer.submissions(pending)
             }), 200
             
         except Exception as e:
@@ -312,7 +303,7 @@ class SellLandAdminController:
             return jsonify({
                 "message": "Submission successfully moved to Land model",
                 "submission": submission.to_json(),
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 201
             
         except Exception as e:
@@ -435,33 +426,21 @@ class SellLandAdminController:
             if error:
                 return error
             
-            # Get counts
-            total_submissions = SellLandSubmission.objects.count()
-            pending_submissions = SellLandSubmission.objects(status='pending').count()
-            approved_submissions = SellLandSubmission.objects(status='approved').count()
-            rejected_submissions = SellLandSubmission.objects(status='rejected').count()
-            moved_submissions = SellLandSubmission.objects(status='moved_to_land').count()
-            
-            # Get counts by land type
-            land_type_stats = {}
-            for land_type in ['Coconut Land', 'Empty Land', 'Commercial Land', 'House']:
-                land_type_stats[land_type] = SellLandSubmission.objects(land_type=land_type).count()
-            
-            # Get recent submissions
-            recent_submissions = SellLandSubmission.objects().order_by('-created_at').limit(10)
-            recent_pending = SellLandSubmission.objects(status='pending').order_by('-created_at').limit(5)
+            # Status/type counters are read from the stats_counters document
+            submission_stats = DashboardStats.submission_stats(recent=10, recent_pending=5)
+            by_status = submission_stats['by_status']
             
             stats = {
                 "overview": {
-                    "total_submissions": total_submissions,
-                    "pending_submissions": pending_submissions,
-                    "approved_submissions": approved_submissions,
-                    "rejected_submissions": rejected_submissions,
-                    "moved_submissions": moved_submissions
+                    "total_submissions": submission_stats['total'],
+                    "pending_submissions": by_status['pending'],
+                    "approved_submissions": by_status['approved'],
+                    "rejected_submissions": by_status['rejected'],
+                    "moved_submissions": by_status['moved_to_land']
                 },
-                "by_land_type": land_type_stats,
-                "recent_submissions": [s.to_json() for s in recent_submissions],
-                "pending_approvals": [s.to_json() for s in recent_pending]
+                "by_land_type": submission_stats['by_land_type'],
+                "recent_submissions": submission_stats['recent'],
+                "pending_approvals": submission_stats['recent_pending']
             }
             
             return jsonify(stats), 200
@@ -491,30 +470,18 @@ class SellLandAdminController:
             if not submission_ids:
                 return jsonify({"error": "Submission IDs are required"}), 400
             
-            # Approve all submissions
-            approved_count = 0
-            failed = []
-            
-            for submission_id in submission_ids:
-                try:
-                    submission = SellLandSubmission.objects(id=submission_id).first()
-                    if submission:
-                        submission.status = 'approved'
-                        submission.approved_at = datetime.now(timezone.utc)
-                        submission.updated_at = datetime.now(timezone.utc)
-                        submission.save()
-                        approved_count += 1
-                    else:
-                        failed.append({"id": submission_id, "reason": "Not found"})
-                except Exception as e:
-                    failed.append({"id": submission_id, "reason": str(e)})
+            # Approve in the background; progress via GET /api/admin/jobs/<job_id>
+            job = JobQueue.enqueue(
+                'submissions.bulk_approve',
+                {"submission_ids": [str(i) for i in submission_ids]},
+                created_by=payload.user_id
+            )
             
             return jsonify({
-                "message": "Bulk approval completed",
-                "approved": approved_count,
-                "failed": len(failed),
-                "failed_details": failed
-            }), 200
+                "message": "Bulk approval queued",
+                "job_id": str(job.id),
+                "status": job.status
+            }), 202
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -541,27 +508,18 @@ class SellLandAdminController:
             if not submission_ids:
                 return jsonify({"error": "Submission IDs are required"}), 400
             
-            # Delete all submissions
-            deleted_count = 0
-            failed = []
-            
-            for submission_id in submission_ids:
-                try:
-                    submission = SellLandSubmission.objects(id=submission_id).first()
-                    if submission:
-                        submission.delete()
-                        deleted_count += 1
-                    else:
-                        failed.append({"id": submission_id, "reason": "Not found"})
-                except Exception as e:
-                    failed.append({"id": submission_id, "reason": str(e)})
+            # Delete in the background; progress via GET /api/admin/jobs/<job_id>
+            job = JobQueue.enqueue(
+                'submissions.bulk_delete',
+                {"submission_ids": [str(i) for i in submission_ids]},
+                created_by=payload.user_id
+            )
             
             return jsonify({
-                "message": "Bulk deletion completed",
-                "deleted": deleted_count,
-                "failed": len(failed),
-                "failed_details": failed
-            }), 200
+                "message": "Bulk deletion queued",
+                "job_id": str(job.id),
+                "status": job.status
+            }), 202
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -1,7 +1,8 @@
-from flask import request, jsonify
+from flask import request, jsonify, g
 from Models.sellLandModel import SellLandSubmission
-from Models.adminModels import Admin_And_User
-from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import require_user
+from Utils.listing import GroupedListing
+from Utils.batchSerializer import BatchSerializer
 from datetime import datetime, timezone
 
 
@@ -12,6 +13,7 @@ class SellLandUserController:
     """
     
     @staticmethod
+    @require_user
     def create_submission():
         """
         Create a new sell land form submission
@@ -19,23 +21,8 @@ class SellLandUserController:
         Body: { name, phone, location, price, area, landType, description? }
         """
         try:
-            # Check authentication using CheckAuthorization
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            import jwt
-            import os
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
-            
-            # Get user
-            user = Admin_And_User.objects(id=user_id).first()
+            # Get user (resolved once per request)
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
@@ -85,80 +72,53 @@ class SellLandUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def get_my_submissions():
         """
         Get all submissions by authenticated user
         GET /api/user/sell-land/my-submissions
+        Query params: view?, page?, page_size?, include_total?
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            import jwt
-            import os
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
-            
-            # Get user
-            user = Admin_And_User.objects(id=user_id).first()
+            try:
+                listing_params = GroupedListing.parse_params(request.args)
+            except ValueError as ve:
+                return jsonify({"error": str(ve)}), 400
+            
+            # Get user (resolved once per request)
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
             # Get all submissions by this user
             submissions = SellLandSubmission.objects(user=user).order_by('-created_at')
             
-            # Group by status
-            grouped = {
-                "pending": [],
-                "approved": [],
-                "rejected": [],
-                "moved_to_land": []
-            }
-            
-            for submission in submissions:
-                submission_json = submission.to_json()
-                grouped[submission.status].append(submission_json)
+            # Group by status and list in a single pass
+            data = GroupedListing.build(
+                submissions,
+                groups=["pending", "approved", "rejected", "moved_to_land"],
+                list_key="submissions",
+                serializer=BatchSerializer.submissions,
+                **listing_params
+            )
             
             return jsonify({
                 "success": True,
-                "data": {
-                    "total": submissions.count(),
-                    "grouped": grouped,
-                    "submissions": [s.to_json() for s in submissions]
-                }
+                "data": data
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def get_submission_by_id():
         """
         Get a specific submission by ID (user can only view their own)
         GET /api/user/sell-land/submission?id=<submission_id>
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            import jwt
-            import os
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get submission ID
             submission_id = request.args.get('id')
@@ -180,6 +140,7 @@ class SellLandUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def update_submission():
         """
         Update user's own pending submission
@@ -187,20 +148,7 @@ class SellLandUserController:
         Body: { name?, phone?, location?, price?, area?, description? }
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            import jwt
-            import os
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get submission ID
             submission_id = request.args.get('id')
@@ -253,26 +201,14 @@ class SellLandUserController:
             return jsonify({"error": str(e)}), 500
     
     @staticmethod
+    @require_user
     def delete_submission():
         """
         Delete user's own submission
         DELETE /api/user/sell-land/delete?id=<submission_id>
         """
         try:
-            # Check authentication
-            token = request.headers.get('token')
-            if not token:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            verify = CheckAuthorization.VerifyToken(token)
-            if verify != True:
-                return verify
-            
-            # Decode token to get user_id
-            import jwt
-            import os
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            user_id = payload.get('user_id')
+            user_id = g.principal.user_id
             
             # Get submission ID
             submission_id = request.args.get('id')
@@ -1,9 +1,12 @@
 from flask import request, jsonify
 from Models.siteContentModels import LandingContent
 from Models.landModels import Land
+from bson import ObjectId
+from Utils.authContext import current_principal
+from Utils.imageStorage import get_storage
+from Utils.httpCache import HttpCache
+from Utils.landingCache import LandingCache
 from datetime import datetime, timezone
-import jwt
-import os
 
 class SiteContentController:
     @staticmethod
@@ -16,68 +19,120 @@ class SiteContentController:
 
     @staticmethod
     def _verify_admin():
-        token = request.headers.get('token')
-        if not token:
-            return None, (jsonify({"success": False, "error": "Token required"}), 401)
-        try:
-            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                return None, (jsonify({"success": False, "error": "Admin access required"}), 403)
-            return payload, None
-        except jwt.ExpiredSignatureError:
-            return None, (jsonify({"success": False, "error": "Token expired"}), 401)
-        except jwt.InvalidTokenError:
-            return None, (jsonify({"success": False, "error": "Invalid token"}), 401)
+        principal, error = current_principal(envelope=True)
+        if error:
+            return None, error
+        if not principal.is_admin:
+            return None, (jsonify({"success": False, "error": "Admin access required"}), 403)
+        return principal, None
+
+    # Land fields an urgent sale card shows; references are resolved with one projected query
+    URGENT_LAND_FIELDS = ('title', 'location', 'size', 'price', 'status', 'images_urls')
+
+    @staticmethod
+    def _urgent_lands(land_ids):
+        """
+        Lands referenced by urgent sales, fetched with a single projected $in query
+
+        Returns:
+            dict: str(land id) -> raw land document (invalid or unknown ids are left out)
+        """
+        ids = {ObjectId(str(land_id)) for land_id in land_ids if land_id and ObjectId.is_valid(str(land_id))}
+        if not ids:
+            return {}
+        projection = {field: 1 for field in SiteContentController.URGENT_LAND_FIELDS}
+        return {str(land['_id']): land for land in Land._get_collection().find({'_id': {'$in': list(ids)}}, projection)}
+
+    @staticmethod
+    def _size_text(land):
+        return f"{land.get('size')} {land.get('size_unit', 'sqft')}" if land.get('size') else ''
+
+    @staticmethod
+    def _enrich_urgent_sales(items, lands=None):
+        """
+        Urgent sale cards with missing fields filled in from their lands
+
+        Args:
+            items: urgent_sales entries (at most 5 are used)
+            lands: Already fetched {land id: raw land} map; fetched in one query when omitted
+
+        Returns:
+            list: Enriched entries; 'image' carries every variant, 'image_url' the card one
+        """
+        items = list(items)[:5]
+        if lands is None:
+            lands = SiteContentController._urgent_lands(item.get('land_id') for item in items)
+        storage = get_storage()
+        resolved = []
+        for item in items:
+            enriched = dict(item)
+            land = lands.get(str(item.get('land_id'))) if item.get('land_id') else None
+            if land:
+                enriched.setdefault('title', land.get('title'))
+                enriched.setdefault('location', land.get('location'))
+                enriched.setdefault('size_text', SiteContentController._size_text(land))
+                enriched.setdefault('price', land.get('price'))
+                enriched.setdefault('status', land.get('status'))
+                # Prefer override image_url else land first image
+                if not enriched.get('image_url'):
+                    imgs = land.get('images_urls') or []
+                    enriched['image_url'] = imgs[0] if imgs else ''
+            # Cards render the card-sized rendition; 'image' carries every variant for srcset
+            if enriched.get('image_url'):
+                enriched['image'] = storage.variants(enriched['image_url'])
+                enriched['image_url'] = enriched['image']['card']
+            resolved.append(enriched)
+        return resolved
+
+    @staticmethod
+    def _resolve_landing(doc=None):
+        """Landing content with urgent sales resolved against their lands (the public payload data)"""
+        doc = doc or SiteContentController._get_singleton()
+        data = doc.to_json()
+        urgent_list = data.get('urgent_sales', [])
+        lands = None
+
+        # If manual list is empty, fall back to Lands marked as urgent
+        if not urgent_list:
+            projection = {field: 1 for field in SiteContentController.URGENT_LAND_FIELDS + ('description',)}
+            cursor = Land._get_collection().find({'is_urgent': True}, projection) \
+                .sort([('urgent_priority', 1), ('updated_at', -1)]).limit(5)
+            lands = {str(land['_id']): land for land in cursor}
+            urgent_list = [{
+                'land_id': land_id,
+                'title': land.get('title'),
+                'description': land.get('description'),
+                'image_url': (land.get('images_urls') or [None])[0],
+                'price': land.get('price'),
+                'location': land.get('location'),
+                'size_text': SiteContentController._size_text(land),
+                'status': land.get('status') or 'available'
+            } for land_id, land in lands.items()]
+
+        data['urgent_sales'] = SiteContentController._enrich_urgent_sales(urgent_list, lands)
+        return data
 
     @staticmethod
     def get_public_landing():
         try:
-            doc = SiteContentController._get_singleton()
-            data = doc.to_json()
-            urgent_list = data.get('urgent_sales', [])
-
-            # If manual list is empty, fall back to Lands marked as urgent
-            if not urgent_list:
-                lands = Land.objects(is_urgent=True).order_by('+urgent_priority', '-updated_at')[:5]
-                fallback = []
-                for land in lands:
-                    lj = land.to_json()
-                    fallback.append({
-                        'land_id': lj.get('id'),
-                        'title': lj.get('urgent_title') or lj.get('title'),
-                        'description': lj.get('urgent_description') or lj.get('description'),
-                        'image_url': lj.get('urgent_image_url') or ((lj.get('images_urls') or [None])[0]),
-                        'price': lj.get('price'),
-                        'location': lj.get('location'),
-                        'size_text': f"{lj.get('size')} {lj.get('size_unit','sqft')}" if lj.get('size') else '',
-                        'status': lj.get('status') or 'available'
-                    })
-                data['urgent_sales'] = fallback
-
-            # resolve urgent sales with land data when land_id is provided (manual list)
-            resolved = []
-            for item in data.get('urgent_sales', [])[:5]:
-                enriched = dict(item)
-                land_id = item.get('land_id')
-                try:
-                    if land_id:
-                        land = Land.objects(id=land_id).first()
-                        if land:
-                            lj = land.to_json()
-                            enriched.setdefault('title', lj.get('title'))
-                            enriched.setdefault('location', lj.get('location'))
-                            enriched.setdefault('size_text', f"{lj.get('size')} {lj.get('size_unit','sqft')}" if lj.get('size') else '')
-                            enriched.setdefault('price', lj.get('price'))
-                            enriched.setdefault('status', lj.get('status'))
-                            # Prefer override image_url else land first image
-                            if not enriched.get('image_url'):
-                                imgs = lj.get('images_urls') or []
-                                enriched['image_url'] = imgs[0] if imgs else ''
-                except Exception:
-                    pass
-                resolved.append(enriched)
-            data['urgent_sales'] = resolved
-            return jsonify({"success": True, "data": data}), 200
+            stamps = LandingCache.stamps()
+            if 'landing' not in stamps:
+                # First hit may create the landing document, which bumps its stamp
+                SiteContentController._get_singleton()
+                stamps = LandingCache.stamps()
+            etag, last_modified = LandingCache.version(stamps)
+
+            # One version-stamp read; the payload itself is served from memory
+            for representation in (etag, LandingCache.representation_etag(etag, True)):
+                cached = HttpCache.not_modified(representation, last_modified, HttpCache.LANDING)
+                if cached:
+                    return cached
+
+            entry = LandingCache.get(
+                etag, last_modified,
+                lambda: {"success": True, "data": SiteContentController._resolve_landing()}
+            )
+            return LandingCache.response(entry, 'gzip' in request.accept_encodings, HttpCache.LANDING)
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
 
@@ -120,6 +175,17 @@ class SiteContentController:
             doc.updated_at = datetime.now(timezone.utc).isoformat()
             doc.save()
 
-            return jsonify({"success": True, "message": "Landing content updated", "data": doc.to_json()}), 200
+            # Rebuild the cached public payload now rather than on the next homepage hit
+            public = SiteContentController._resolve_landing(doc)
+            etag, last_modified = LandingCache.version(LandingCache.stamps())
+            LandingCache.put(etag, last_modified, {"success": True, "data": public})
+
+            return jsonify({
+                "success": True,
+                "message": "Landing content updated",
+                "data": doc.to_json(),
+                # What visitors will see: urgent sales resolved against their lands
+                "resolved_urgent_sales": public['urgent_sales']
+            }), 200
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
@@ -1,17 +1,19 @@
 from Models.adminModels import Admin_And_User
 from Models.landModels import Land
-from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
-import jwt
-import os
+from flask import Blueprint, request, jsonify, g
+from datetime import datetime
+from Utils.CheckAuthorization import CheckAuthorization
+from Utils.passwordHasher import PasswordHasher, PasswordHasherBusy
+from Utils.authContext import require_user
+from Utils.batchSerializer import BatchSerializer
+from Utils.dashboardStats import DashboardStats
 
 class UserController:
     def create_user():
         try:
             data = request.json
 
-            hashed_password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+            hashed_password = PasswordHasher.hash(data['password'])
 
             user = Admin_And_User(
                 username=data['username'],
@@ -22,39 +24,22 @@ class UserController:
             )
             user.save()
 
-            payload = {
-                "user_id": str(user.id),
-                "username": user.username,
-                "role": user.role,
-                "exp": datetime.utcnow() + timedelta(minutes=int(os.getenv("JWT_EXPIRATION_MINUTES", 60)))
-            }
-
-            token = jwt.encode(payload, os.getenv("JWT_SECRET"), algorithm=os.getenv("JWT_ALGORITHM", "HS256"))
+            token = CheckAuthorization.create_token(user)
 
             return jsonify({
                 "message": "User created successfully",
                 "token": token
             }), 201
 
+        except PasswordHasherBusy as busy:
+            return jsonify({"error": str(busy)}), 503, {"Retry-After": str(busy.retry_after)}
         except Exception as e:
             return jsonify({"error": str(e)}), 400
 
+    @require_user
     def get_user():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
-            user = Admin_And_User.objects(id=user_id).first()
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
 
@@ -63,22 +48,10 @@ class UserController:
         except Exception as e:
             return jsonify({"error": str(e)}), 400
 
+    @require_user
     def update_user():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-
-            user = Admin_And_User.objects(id=user_id).first()
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
 
@@ -86,7 +59,7 @@ class UserController:
 
             # Only hash if password is being updated
             if data.get('password'):
-                user.password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+                user.password = PasswordHasher.hash(data['password'])
 
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
@@ -96,88 +69,61 @@ class UserController:
                 user.phone = data.get('phone')
 
             user.save()
+            if data.get('password'):
+                CheckAuthorization.revoke_tokens(user.id)
+            else:
+                CheckAuthorization.invalidate_user(user.id)
 
             return jsonify({"message": "User updated successfully"}), 200
 
+        except PasswordHasherBusy as busy:
+            return jsonify({"error": str(busy)}), 503, {"Retry-After": str(busy.retry_after)}
         except Exception as e:
             return jsonify({"error": str(e)}), 400
 
+    @require_user
     def delete_user():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            
-            user = Admin_And_User.objects(id=user_id).first()
+            user = g.principal.user
             if not user:
                 return jsonify({"error": "User not found"}), 404
             
             user.delete()
+            CheckAuthorization.revoke_deleted_user(user.id)
             return jsonify({"message": "User deleted successfully"}), 200
 
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def get_my_lands():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            user_id = g.principal.user_id
             
             # Get lands created by this user (you might want to add a user_id field to Land model)
             # For now, we'll return all lands with status 'pending' or 'approved'
             user_lands = Land.objects(status__in=['pending', 'available', 'sold'])
-            lands_list = [land.to_json() for land in user_lands]
+            lands_list = BatchSerializer.lands(user_lands)
             
             return jsonify(lands_list), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def get_user_dashboard():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            user_id = g.principal.user_id
             
-            # Get user's lands statistics
-            total_lands = Land.objects.count()  # This should be filtered by user_id when model is updated
-            pending_lands = Land.objects(status='pending').count()
-            available_lands = Land.objects(status='available').count()
-            sold_lands = Land.objects(status='sold').count()
+            # Get user's lands statistics from the stats_counters document
+            # This should be filtered by user_id when model is updated
+            land_stats = DashboardStats.land_stats(recent=0)
             
             stats = {
-                "total_lands": total_lands,
-                "pending_lands": pending_lands,
-                "available_lands": available_lands,
-                "sold_lands": sold_lands
+                "total_lands": land_stats['total'],
+                "pending_lands": land_stats['by_status']['pending'],
+                "available_lands": land_stats['by_status']['available'],
+                "sold_lands": land_stats['by_status']['sold']
             }
             
             return jsonify(stats), 200
@@ -185,20 +131,10 @@ class UserController:
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def submit_land():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            user_id = g.principal.user_id
             
             data = request.json
             if not data:
@@ -213,26 +149,16 @@ class UserController:
             
             return jsonify({
                 "message": "Land submitted successfully and pending approval",
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 201
             
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def update_my_land():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
+            user_id = g.principal.user_id
             
             land_id = request.args.get('id')
             if not land_id:
@@ -253,26 +179,16 @@ class UserController:
             
             return jsonify({
                 "message": "Land updated successfully",
-                "land": land.to_json()
+                "land": BatchSerializer.land(land)
             }), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 400
     
+    @require_user
     def delete_my_land():
         try:
-            user_token = request.headers.get('token')
-            if not user_token:
-                return jsonify({"error": "Token required"}), 401
-            
-            # Verify token
-            try:
-                payload = jwt.decode(user_token, os.getenv("JWT_SECRET"), algorithms=[os.getenv("JWT_ALGORITHM", "HS256")])
-                user_id = payload.get('user_id')
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 400
+            user_id = g.principal.user_id
             
             land_id = request.args.get('id')
             if not land_id:
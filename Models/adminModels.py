@@ -8,11 +8,21 @@ class Admin_And_User(Document):
     phone = StringField(required=False, unique=True, sparse=True)
     password = StringField(required=True)
     role = StringField(required=True, choices=['admin', 'user'])
+    # Legacy: last issued token, only checked for tokens without a `tv` claim
     auth_token = StringField()
+    # Bumped on logout / password change; tokens carrying an older `tv` are revoked
+    token_version = IntField(default=0)
     full_name = StringField(required=True)
     created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
 
+    meta = {
+        'indexes': ['updated_at']
+    }
 
+    def clean(self):
+        # Lets other processes pick up changes by polling updated_at (see Utils.tokenVersions)
+        self.updated_at = datetime.utcnow()
 
     def to_json(self):
         return {
@@ -0,0 +1,19 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+from datetime import datetime, timezone
+
+
+class CollectionVersion(Document):
+    """
+    Write counter of one collection, used as the version stamp of cached list responses
+    Bumped on every document save/delete (see Utils.httpCache.CollectionVersions)
+    """
+    # 'lands', 'users', 'landing', or 'landing_lands' (lands shown on the landing page, see Utils.landingCache)
+    key = StringField(required=True, unique=True)
+    version = IntField(default=0)
+    # Random per counter document, so a recreated counter never repeats old stamps
+    epoch = StringField()
+    updated_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+
+    meta = {
+        'collection': 'collection_versions'
+    }
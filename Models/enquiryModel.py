@@ -3,6 +3,9 @@ from datetime import datetime, timezone
 from Models.adminModels import Admin_And_User
 from Models.landModels import Land
 
+# Sentinel for "reference not pre-resolved by the caller"
+_UNRESOLVED = object()
+
 
 class Enquiry(Document):
     """
@@ -62,29 +65,38 @@ class Enquiry(Document):
         ]
     }
     
-    def to_json(self):
-        """Convert to JSON for API responses"""
+    def to_json(self, user=_UNRESOLVED, land=_UNRESOLVED):
+        """
+        Convert to JSON for API responses
+
+        user/land may be passed in already resolved (see Utils.batchSerializer)
+        to avoid dereferencing each reference with its own query.
+        """
+        if user is _UNRESOLVED:
+            user = self.user
+        if land is _UNRESOLVED:
+            land = self.land
         return {
             "id": str(self.id),
             "is_guest": self.is_guest,
             "user": {
-                "id": str(self.user.id),
-                "username": self.user.username,
-                "full_name": self.user.full_name,
-                "email": self.user.email
-            } if self.user else None,
+                "id": str(user.id),
+                "username": user.username,
+                "full_name": user.full_name,
+                "email": user.email
+            } if user else None,
             "land": {
-                "id": str(self.land.id),
-                "title": self.land.title,
-                "location": self.land.location,
-                "price": self.land.price,
-                "size": self.land.size,
-                "property_type": self.land.property_type,
-                "status": self.land.status,
-                "address": self.land.address,
-                "latitude": self.land.latitude,
-                "longitude": self.land.longitude
-            } if self.land else None,
+                "id": str(land.id),
+                "title": land.title,
+                "location": land.location,
+                "price": land.price,
+                "size": land.size,
+                "property_type": land.property_type,
+                "status": land.status,
+                "address": land.address,
+                "latitude": land.latitude,
+                "longitude": land.longitude
+            } if land else None,
             "enquiry_type": self.enquiry_type,
             "contact_name": self.contact_name,
             "contact_phone": self.contact_phone,
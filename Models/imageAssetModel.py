@@ -0,0 +1,52 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+from datetime import datetime, timezone
+
+
+class ImageAsset(Document):
+    """
+    One stored image, keyed by the SHA-256 of its content
+    Uploads of identical bytes reuse the asset; ref_count is the number of lands listing its url
+    """
+    # Computed by this server while streaming the upload; unset for direct uploads,
+    # whose content the server never sees (those are never deduplicated against)
+    sha256 = StringField(max_length=64)
+
+    # Storage location (see Utils.imageStorage)
+    backend = StringField(required=True)
+    public_id = StringField(required=True)
+    url = StringField(required=True)
+
+    bytes = IntField()
+    width = IntField()
+    height = IntField()
+    format = StringField()
+
+    # Lands whose images_urls contain url (maintained by Utils.imageAssets)
+    ref_count = IntField(default=0)
+
+    created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    # Last upload that returned this asset; cleanup spares assets reused after it was queued
+    last_used_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+
+    meta = {
+        'collection': 'image_assets',
+        'indexes': [
+            {
+                'fields': ['sha256', 'backend'],
+                'unique': True,
+                'partialFilterExpression': {'sha256': {'$type': 'string'}}
+            },
+            'url',
+            'public_id'
+        ]
+    }
+
+    def to_upload_result(self):
+        """Same shape as ImageStorage.put() results"""
+        return {
+            "url": self.url,
+            "public_id": self.public_id,
+            "width": self.width,
+            "height": self.height,
+            "format": self.format
+        }
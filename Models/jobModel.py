@@ -0,0 +1,65 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, DictField
+from datetime import datetime, timezone
+
+
+class Job(Document):
+    """
+    Background job stored in the jobs collection
+    Claimed atomically by a worker (see Utils.jobQueue) and retried with backoff on failure
+    """
+    # Registered handler name, e.g. 'land_images.delete'
+    name = StringField(required=True, max_length=100)
+    payload = DictField(default=dict)
+
+    # Status tracking
+    status = StringField(required=True, choices=['queued', 'running', 'succeeded', 'failed'], default='queued')
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=5)
+    run_at = DateTimeField(default=lambda: datetime.now(timezone.utc))  # not claimed before this time
+    locked_until = DateTimeField()  # lease of the running attempt; expired leases are reclaimed
+    worker = StringField()
+
+    # Checkpoint saved by long-running handlers; a retried attempt resumes from it
+    progress = DictField()
+
+    # Outcome
+    result = DictField()
+    error = StringField()
+
+    # Set by JobQueue.enqueue_once while the job is queued or running (unique)
+    unique_key = StringField()
+
+    # User who triggered the job (user id)
+    created_by = StringField()
+
+    # Timestamps
+    created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    updated_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    finished_at = DateTimeField()
+
+    meta = {
+        'collection': 'jobs',
+        'indexes': [
+            ('status', 'run_at'),
+            ('status', 'locked_until'),
+            ('name', 'status'),
+            {'fields': ['unique_key'], 'unique': True, 'sparse': True}
+        ]
+    }
+
+    def to_json(self):
+        return {
+            "id": str(self.id),
+            "name": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "progress": self.progress or None,
+            "result": self.result,
+            "error": self.error,
+            "created_by": self.created_by,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
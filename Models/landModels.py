@@ -2,6 +2,9 @@ from mongoengine import Document, StringField, IntField, ListField, DateTimeFiel
 from datetime import datetime, timezone
 from Models.adminModels import Admin_And_User
 
+# Sentinel for "reference not pre-resolved by the caller"
+_UNRESOLVED = object()
+
 
 class Land(Document):
     # User who created this land
@@ -36,14 +39,39 @@ class Land(Document):
     # urgent_description = StringField()
     # urgent_image_url = StringField()
 
-    def to_json(self):
+    meta = {
+        'indexes': [
+            # Public/admin listings: status filter, newest first (keyset on created_at, _id)
+            ('status', '-created_at', '-id'),
+            ('-created_at', '-id'),
+            # Listing filtered by property type
+            ('status', 'property_type', '-created_at'),
+            # Price / size range filters
+            ('status', 'price'),
+            ('status', 'size'),
+            # Landing page urgent sales
+            ('is_urgent', 'urgent_priority', '-updated_at'),
+            # Relevance-ranked search for the public listing (?search=)
+            {
+                'fields': ['$title', '$location', '$address', '$description'],
+                'weights': {'title': 10, 'location': 5, 'address': 3, 'description': 1},
+                'default_language': 'english',
+                'name': 'land_text_search'
+            }
+        ]
+    }
+
+    def to_json(self, user=_UNRESOLVED):
+        # user may be passed in already resolved (see Utils.batchSerializer)
+        if user is _UNRESOLVED:
+            user = self.user
         return {
             "id": str(self.id),
             "user": {
-                "id": str(self.user.id),
-                "username": self.user.username,
-                "full_name": self.user.full_name
-            } if self.user else None,
+                "id": str(user.id),
+                "username": user.username,
+                "full_name": user.full_name
+            } if user else None,
             "title": self.title,
             "location": self.location,
             "size": self.size,
@@ -69,6 +97,8 @@ class Land(Document):
     
     def clean(self):
         """Custom validation"""
+        # Every save stamps updated_at; it versions the land's public representation (ETag)
+        self.updated_at = datetime.now(timezone.utc)
         if self.price < 0:
             raise ValueError("Price cannot be negative")
         if self.size <= 0:
@@ -2,6 +2,9 @@ from mongoengine import Document, StringField, IntField, DateTimeField, Referenc
 from datetime import datetime, timezone
 from Models.adminModels import Admin_And_User
 
+# Sentinel for "reference not pre-resolved by the caller"
+_UNRESOLVED = object()
+
 
 class SellLandSubmission(Document):
     """
@@ -46,16 +49,23 @@ class SellLandSubmission(Document):
         ]
     }
     
-    def to_json(self):
-        """Convert to JSON for API responses"""
+    def to_json(self, user=_UNRESOLVED):
+        """
+        Convert to JSON for API responses
+
+        user may be passed in already resolved (see Utils.batchSerializer)
+        to avoid dereferencing it with its own query.
+        """
+        if user is _UNRESOLVED:
+            user = self.user
         return {
             "id": str(self.id),
             "user": {
-                "id": str(self.user.id),
-                "username": self.user.username,
-                "full_name": self.user.full_name,
-                "email": self.user.email
-            } if self.user else None,
+                "id": str(user.id),
+                "username": user.username,
+                "full_name": user.full_name,
+                "email": user.email
+            } if user else None,
             "owner_name": self.owner_name,
             "contact_phone": self.contact_phone,
             "location": self.location,
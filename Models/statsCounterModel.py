@@ -0,0 +1,32 @@
+from mongoengine import Document, StringField, DictField, DateTimeField, IntField
+from datetime import datetime, timezone
+
+
+class StatsCounter(Document):
+    """
+    Materialized dashboard counters for one collection
+    Maintained incrementally on every write and periodically reconciled
+    """
+    # Counted collection: 'lands', 'enquiries', 'sell_land_submissions' or 'users'
+    key = StringField(required=True, unique=True)
+
+    # { "total": n, "<dimension>": { "<value>": n, ... }, ... }
+    counts = DictField(default=dict)
+
+    # Bumped by every increment; reconciliation only replaces counts at an unchanged version
+    version = IntField(default=0)
+
+    updated_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
+    reconciled_at = DateTimeField()
+
+    meta = {
+        'collection': 'stats_counters'
+    }
+
+    def to_json(self):
+        return {
+            "key": self.key,
+            "counts": self.counts or {},
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None
+        }
@@ -67,8 +67,9 @@ def create_guest_enquiry():
 def get_available_lands():
     """
     GET /api/user/enquiries/available-lands
-    Get all available lands for browsing
-    Query params: property_type?, location?, min_price?, max_price?, min_size?, max_size?
+    Get available lands for browsing (cursor paginated)
+    Query params: property_type?, location?, min_price?, max_price?, min_size?, max_size?, search?,
+                  limit?, cursor?, include_total?
     """
     return EnquiryUserController.get_available_lands()
 
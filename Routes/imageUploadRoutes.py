@@ -34,3 +34,34 @@ def delete_multiple_land_images():
     Body: { "image_urls": ["url1", "url2"] } or { "public_ids": ["id1", "id2"] }
     """
     return ImageUploadController.delete_multiple_land_images()
+
+@image_upload_bp.route('/direct-upload/sign', methods=['POST'])
+def sign_direct_upload():
+    """
+    POST /api/admin/images/direct-upload/sign
+    Get signed parameters to upload one image straight to Cloudinary (bytes never pass through this server)
+    Requires: Admin authentication
+    Body: { "land_id": "optional" }
+    """
+    return ImageUploadController.sign_direct_upload()
+
+@image_upload_bp.route('/direct-upload/confirm', methods=['POST'])
+def confirm_direct_upload():
+    """
+    POST /api/admin/images/direct-upload/confirm
+    Verify a direct upload and register the image (attached to the land named when signing)
+    Requires: Admin authentication
+    Body: { "upload_token", "public_id", "version", "signature" }
+    """
+    return ImageUploadController.confirm_direct_upload()
+
+@image_upload_bp.route('/gc', methods=['POST'])
+def collect_garbage():
+    """
+    POST /api/admin/images/gc
+    Queue a job that deletes stored images no land or landing content refers to (dry run by default)
+    Requires: Admin authentication
+    Body: { "dry_run": true, "grace_hours": 24 }
+    Poll GET /api/admin/jobs/<job_id> for progress and the report
+    """
+    return ImageUploadController.collect_garbage()
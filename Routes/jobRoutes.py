@@ -0,0 +1,14 @@
+from flask import Blueprint
+from Controllers.jobController import JobController
+
+# Create blueprint for background job routes
+job_bp = Blueprint('jobs', __name__, url_prefix='/api/admin/jobs')
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    GET /api/admin/jobs/<job_id>
+    Get the status and result of a background job (bulk actions, image cleanup)
+    Requires: token in headers (admin role)
+    """
+    return JobController.get_job(job_id)
@@ -6,3 +6,4 @@ login_bp = Blueprint('login', __name__)
 # Authentication routes
 login_bp.add_url_rule('/login', view_func=LoginController.login, methods=['POST'])
 login_bp.add_url_rule('/change-password', view_func=LoginController.change_password, methods=['POST'])
+login_bp.add_url_rule('/logout', view_func=LoginController.logout, methods=['POST'])
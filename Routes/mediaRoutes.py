@@ -0,0 +1,7 @@
+from flask import Blueprint
+from Controllers.mediaController import MediaController
+
+# Locally stored images (public, no token); app.py mounts this at the path of IMAGE_STORAGE_LOCAL_URL
+media_bp = Blueprint('media', __name__)
+
+media_bp.add_url_rule('/<path:path>', view_func=MediaController.serve, methods=['GET'])
@@ -0,0 +1,14 @@
+from flask import Blueprint
+from Controllers.metricsController import MetricsController
+
+# Create blueprint for runtime metrics routes
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/admin/metrics')
+
+@metrics_bp.route('/dependencies', methods=['GET'])
+def get_dependency_metrics():
+    """
+    GET /api/admin/metrics/dependencies
+    Circuit breaker state and latency percentiles of external services (per worker process)
+    Requires: token in headers (admin role)
+    """
+    return MetricsController.get_dependency_metrics()
@@ -1,55 +1,120 @@
 import jwt
 from Models.adminModels import Admin_And_User
+from Utils.tokenCache import TokenCache
+from Utils.tokenVersions import TokenVersions
 import logging
 from flask import jsonify
 import os
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class CheckAuthorization():
     def VerifyToken(token):
+        claims, error = CheckAuthorization.resolve(token)
+        if error:
+            return error
+        return True
+
+    def resolve(token):
+        """
+        Verify a token and return its claims
+
+        Tokens carry the user's token version (`tv`) and are accepted while it matches
+        TokenVersions, so no user document is read per request. Legacy tokens without
+        `tv` fall back to comparing the stored auth_token (cleared on revocation).
+        Either way the cache entry records the token version the token was accepted
+        under, and a hit is only served while that is still the user's version.
+        Signature and expiry are only checked on a TokenCache miss.
+
+        Returns:
+            tuple: (claims, None) on success, (None, (error_body, status_code)) on failure
+        """
         try:
             if not token:
-                return {"error": "Token is required"}, 401
-            
+                return None, ({"error": "Token is required"}, 401)
+
+            cached = TokenCache.get(token)
+            if cached is not None:
+                claims, version = cached
+                if TokenVersions.current(claims['user_id']) == version:
+                    return claims, None
+                TokenCache.invalidate(token)
+                return None, ({"error": "Token has been revoked"}, 401)
+
             try:
                 # Get JWT secret from environment variables
                 secret_key = os.getenv("JWT_SECRET")
                 if not secret_key:
                     logging.error("JWT_SECRET not found in environment variables")
-                    return {"error": "Server configuration error"}, 500
-                
+                    return None, ({"error": "Server configuration error"}, 500)
+
                 # Decode and verify the JWT token
                 decoded_token = jwt.decode(token, secret_key, algorithms=["HS256"])
-                
+
                 # Check if user exists and token is valid
                 user_id = decoded_token.get('user_id')
                 if not user_id:
-                    return {"error": "Invalid token format"}, 401
-                
-                user = Admin_And_User.objects(id=user_id).first()
-                if not user:
-                    return {"error": "User not found"}, 401
-                
-                # Check if token matches the user's stored token
-                if user.auth_token != token:
-                    return {"error": "Token mismatch"}, 401
-                
-                return True
-                
+                    return None, ({"error": "Invalid token format"}, 401)
+
+                if 'tv' in decoded_token:
+                    version = TokenVersions.current(user_id)
+                    if version is None:
+                        return None, ({"error": "User not found"}, 401)
+                    if version != decoded_token['tv']:
+                        return None, ({"error": "Token has been revoked"}, 401)
+                else:
+                    user = Admin_And_User.objects(id=user_id).only('auth_token').first()
+                    if not user:
+                        return None, ({"error": "User not found"}, 401)
+
+                    # Check if token matches the user's stored token
+                    if user.auth_token != token:
+                        return None, ({"error": "Token mismatch"}, 401)
+                    version = TokenVersions.current(user_id)
+
+                TokenCache.put(token, decoded_token, version)
+                return decoded_token, None
+
             except jwt.ExpiredSignatureError as e:
                 logging.error(f"Token Expired Error in verify_token: {str(e)}")
-                return {"error": "Token has expired"}, 401
+                return None, ({"error": "Token has expired"}, 401)
             except jwt.InvalidTokenError as e:
                 logging.error(f"Invalid Token Error in verify_token: {str(e)}")
-                return {"error": "Invalid token"}, 401
+                return None, ({"error": "Invalid token"}, 401)
             except Exception as e:
                 logging.error(f"JWT Decode Error in verify_token: {str(e)}")
-                return {"error": "Token verification failed"}, 401
-                
+                return None, ({"error": "Token verification failed"}, 401)
+
         except Exception as e:
             logging.error(f"Unexpected Error in verify_token: {str(e)}")
-            return {"error": f"Authorization error: {str(e)}"}, 500
-        
-        
\ No newline at end of file
+            return None, ({"error": f"Authorization error: {str(e)}"}, 500)
+
+    def create_token(user):
+        """Issue a JWT for a user, bound to the user's current token version"""
+        payload = {
+            "user_id": str(user.id),
+            "username": user.username,
+            "role": user.role,
+            "tv": user.token_version or 0,
+            "exp": datetime.utcnow() + timedelta(minutes=int(os.getenv("JWT_EXPIRATION_MINUTES", 60)))
+        }
+        return jwt.encode(payload, os.getenv("JWT_SECRET"), algorithm=os.getenv("JWT_ALGORITHM", "HS256"))
+
+    def revoke_tokens(user_id):
+        """Revoke every token issued to a user so far (logout, password change)"""
+        TokenVersions.bump(user_id)
+        TokenCache.invalidate_user(user_id)
+
+    def invalidate_user(user_id):
+        """Forget cached verifications for a user whose credentials or session changed"""
+        if user_id:
+            TokenCache.invalidate_user(user_id)
+            TokenVersions.forget(user_id)
+
+    def revoke_deleted_user(user_id):
+        """Reject a deleted user's tokens here and, within one poll, in every other process"""
+        if user_id:
+            TokenCache.invalidate_user(user_id)
+            TokenVersions.deleted(user_id)
@@ -0,0 +1,111 @@
+from functools import wraps
+from flask import g, request, jsonify
+from Models.adminModels import Admin_And_User
+from Utils.CheckAuthorization import CheckAuthorization
+
+
+class Principal:
+    """
+    Authenticated caller of the current request
+
+    Built once from the verified token claims and stored on flask.g; the user
+    document is only loaded if a controller actually needs it.
+    """
+
+    def __init__(self, claims):
+        self.claims = claims
+        self.user_id = claims.get('user_id')
+        self.role = claims.get('role')
+        self.username = claims.get('username')
+        self._user = None
+        self._user_loaded = False
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def user(self):
+        """Admin_And_User document of the caller (loaded lazily, at most once per request)"""
+        if not self._user_loaded:
+            self._user = Admin_And_User.objects(id=self.user_id).first()
+            self._user_loaded = True
+        return self._user
+
+    def get(self, key, default=None):
+        return self.claims.get(key, default)
+
+    def __getitem__(self, key):
+        return self.claims[key]
+
+
+def load_principal():
+    """
+    Resolve the request token into g.principal
+
+    Returns:
+        None on success, otherwise an error response tuple
+    """
+    if g.get('principal') is not None:
+        return None
+
+    token = request.headers.get('token')
+    if not token:
+        return jsonify({"error": "Authentication required"}), 401
+
+    claims, error = CheckAuthorization.resolve(token)
+    if error:
+        return error
+
+    g.principal = Principal(claims)
+    return None
+
+
+def current_principal(envelope=False):
+    """Return the principal of the current request, resolving it if needed"""
+    error = load_principal()
+    if error:
+        return None, _enveloped(error) if envelope else error
+    return g.principal, None
+
+
+def _enveloped(error):
+    """Add "success": False to an auth error, for endpoints whose responses carry it"""
+    body, status = error[0], error[1]
+    data = body.get_json() if hasattr(body, 'get_json') else dict(body)
+    return jsonify({"success": False, **data}), status
+
+
+def require_user(view=None, *, envelope=False):
+    """
+    Reject the request unless it carries a valid token; the caller is available as g.principal
+
+    Use as @require_user, or @require_user(envelope=True) on endpoints whose
+    error bodies include "success": False.
+    """
+    if view is None:
+        return lambda v: require_user(v, envelope=envelope)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        error = load_principal()
+        if error:
+            return _enveloped(error) if envelope else error
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def require_admin(view=None, *, envelope=False):
+    """Like require_user, but the caller must also have the admin role"""
+    if view is None:
+        return lambda v: require_admin(v, envelope=envelope)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        error = load_principal()
+        if not error and not g.principal.is_admin:
+            error = jsonify({"error": "Admin access required"}), 403
+        if error:
+            return _enveloped(error) if envelope else error
+        return view(*args, **kwargs)
+    return wrapper
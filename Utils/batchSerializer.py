@@ -0,0 +1,98 @@
+from bson import DBRef, ObjectId
+from mongoengine import Document
+from Models.adminModels import Admin_And_User
+from Models.landModels import Land
+from Utils.imageStorage import get_storage
+
+
+class BatchSerializer:
+    """
+    Serialize a page of documents with their references resolved in bulk
+
+    Instead of letting every to_json() dereference its user/land one query at a
+    time (N+1), the referenced ids of the whole page are collected first and
+    fetched with a single projected `$in` query per collection.
+    """
+
+    # Only the fields the to_json() methods actually read
+    USER_FIELDS = ('id', 'username', 'full_name', 'email')
+    LAND_FIELDS = ('id', 'title', 'location', 'price', 'size', 'property_type',
+                   'status', 'address', 'latitude', 'longitude')
+    # Image sizes emitted per image in list payloads
+    LIST_IMAGE_VARIANTS = ('thumbnail', 'card')
+
+    @staticmethod
+    def ref_id(doc, field):
+        """Return the ObjectId stored in a reference field without dereferencing it"""
+        value = doc._data.get(field)
+        if value is None:
+            return None
+        if isinstance(value, DBRef):
+            return value.id
+        if isinstance(value, Document):
+            return value.pk
+        if isinstance(value, ObjectId):
+            return value
+        return None
+
+    @staticmethod
+    def fetch_map(model, ids, fields):
+        """Fetch documents by id with one projected query; returns {ObjectId: document}"""
+        ids = {i for i in ids if i is not None}
+        if not ids:
+            return {}
+        return {doc.id: doc for doc in model.objects(id__in=list(ids)).only(*fields)}
+
+    @staticmethod
+    def enquiries(enquiries):
+        """Serialize Enquiry documents with users and lands fetched in bulk"""
+        enquiries = list(enquiries)
+        user_ids = [BatchSerializer.ref_id(e, 'user') for e in enquiries]
+        land_ids = [BatchSerializer.ref_id(e, 'land') for e in enquiries]
+        users = BatchSerializer.fetch_map(Admin_And_User, user_ids, BatchSerializer.USER_FIELDS)
+        lands = BatchSerializer.fetch_map(Land, land_ids, BatchSerializer.LAND_FIELDS)
+        return [
+            e.to_json(user=users.get(user_id), land=lands.get(land_id))
+            for e, user_id, land_id in zip(enquiries, user_ids, land_ids)
+        ]
+
+    @staticmethod
+    def submissions(submissions):
+        """Serialize SellLandSubmission documents with users fetched in bulk"""
+        submissions = list(submissions)
+        user_ids = [BatchSerializer.ref_id(s, 'user') for s in submissions]
+        users = BatchSerializer.fetch_map(Admin_And_User, user_ids, BatchSerializer.USER_FIELDS)
+        return [s.to_json(user=users.get(user_id)) for s, user_id in zip(submissions, user_ids)]
+
+    @staticmethod
+    def land_images(images_urls, detail=False):
+        """
+        Rendition URLs of a land's images
+
+        Lists only need thumbnail and card URLs per image; detail pages get every
+        rendition (see ImageStorage.variants). image_url is the cover image at
+        the size the page renders: card in lists, full on detail pages.
+
+        Returns:
+            dict: { images: [...], image_url }
+        """
+        storage = get_storage()
+        sizes = None if detail else BatchSerializer.LIST_IMAGE_VARIANTS
+        images = [storage.variants(url, sizes) for url in images_urls or []]
+        return {"images": images, "image_url": images[0]['full' if detail else 'card'] if images else None}
+
+    @staticmethod
+    def land(land):
+        """Serialize one Land for a detail response, with every image rendition"""
+        return dict(land.to_json(), **BatchSerializer.land_images(land.images_urls, detail=True))
+
+    @staticmethod
+    def lands(lands):
+        """Serialize Land documents with their owners fetched in bulk"""
+        lands = list(lands)
+        user_ids = [BatchSerializer.ref_id(land, 'user') for land in lands]
+        users = BatchSerializer.fetch_map(Admin_And_User, user_ids, BatchSerializer.USER_FIELDS)
+        return [
+            dict(land.to_json(user=users.get(user_id)), **BatchSerializer.land_images(land.images_urls))
+            for land, user_id in zip(lands, user_ids)
+        ]
@@ -1,8 +1,13 @@
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.utils
+import cloudinary.exceptions
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from Utils.resilience import Dependency, DependencyUnavailable
 
 load_dotenv()
 
@@ -13,6 +18,68 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET")
 )
 
+# Parallel upload/delete calls per worker process
+CLOUDINARY_CONCURRENCY = max(int(os.getenv("CLOUDINARY_UPLOAD_CONCURRENCY", 4)), 1)
+
+# Keep one kept-alive HTTPS connection per concurrent call instead of the SDK's
+# single pooled connection, so parallel uploads reuse connections too
+try:
+    import cloudinary.api_client.call_api
+    cloudinary.uploader._http = cloudinary.utils.get_http_connector(
+        cloudinary.config(), dict(cloudinary.CERT_KWARGS, maxsize=CLOUDINARY_CONCURRENCY)
+    )
+    cloudinary.api_client.call_api._http = cloudinary.utils.get_http_connector(
+        cloudinary.config(), dict(cloudinary.CERT_KWARGS, maxsize=CLOUDINARY_CONCURRENCY)
+    )
+except Exception:
+    pass
+
+# Cloudinary answered, but rejected this particular request (bad file, unknown id, ...)
+_REJECTED = (
+    cloudinary.exceptions.BadRequest,
+    cloudinary.exceptions.AuthorizationRequired,
+    cloudinary.exceptions.NotAllowed,
+    cloudinary.exceptions.NotFound,
+    cloudinary.exceptions.AlreadyExists,
+)
+# Upload API transport errors are plain cloudinary Errors with these prefixes
+_TRANSPORT_ERRORS = ("Unexpected error", "Socket error", "Error parsing server response")
+
+
+def _is_provider_failure(e):
+    """True if e means Cloudinary is slow or failing (as opposed to rejecting the request)"""
+    if isinstance(e, _REJECTED):
+        return False
+    if type(e) is cloudinary.exceptions.Error:
+        return str(e).startswith(_TRANSPORT_ERRORS)
+    return True
+
+
+# Deadline, retries, circuit breaker and concurrency cap of every Cloudinary call
+CLOUDINARY = Dependency(
+    'cloudinary',
+    timeout=float(os.getenv("CLOUDINARY_TIMEOUT_SECONDS", 20)),
+    retries=int(os.getenv("CLOUDINARY_RETRIES", 2)),
+    attempt_timeout=float(os.getenv("CLOUDINARY_ATTEMPT_TIMEOUT_SECONDS", 0)) or None,
+    failure_threshold=int(os.getenv("CLOUDINARY_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.getenv("CLOUDINARY_BREAKER_RESET_SECONDS", 30)),
+    max_concurrent=int(os.getenv("CLOUDINARY_MAX_IN_FLIGHT", CLOUDINARY_CONCURRENCY * 2)),
+    queue_timeout=float(os.getenv("CLOUDINARY_QUEUE_TIMEOUT_SECONDS", 0.5)),
+    is_failure=_is_provider_failure
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Shared bounded thread pool for Cloudinary calls"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CLOUDINARY_CONCURRENCY, thread_name_prefix="cloudinary")
+        return _executor
+
 class CloudinaryUpload:
     """
     Utility class for uploading and managing images on Cloudinary
@@ -31,8 +98,8 @@ class CloudinaryUpload:
             dict: Contains 'url' and 'public_id' of uploaded image
         """
         try:
-            # Upload image to Cloudinary
-            result = cloudinary.uploader.upload(
+            # Upload image to Cloudinary (not retried: a retry could store the image twice)
+            result = CLOUDINARY.call(lambda timeout: cloudinary.uploader.upload(
                 file,
                 folder=folder,
                 resource_type="image",
@@ -41,8 +108,9 @@ class CloudinaryUpload:
                     {'width': 1200, 'height': 800, 'crop': 'limit'},
                     {'quality': 'auto:good'},
                     {'fetch_format': 'auto'}
-                ]
-            )
+                ],
+                timeout=timeout
+            ))
             
             return {
                 'url': result.get('secure_url'),
@@ -51,31 +119,82 @@ class CloudinaryUpload:
                 'height': result.get('height'),
                 'format': result.get('format')
             }
+        except DependencyUnavailable:
+            raise
         except Exception as e:
             raise Exception(f"Failed to upload image: {str(e)}")
     
     @staticmethod
-    def upload_multiple_images(files, folder="gem_lands"):
+    def upload_multiple_images(files, folder="gem_lands", upload_fn=None):
         """
-        Upload multiple images to Cloudinary
+        Upload multiple images to Cloudinary in parallel
+        
+        Files are uploaded on a shared pool of CLOUDINARY_UPLOAD_CONCURRENCY threads;
+        one failing file does not stop the others.
         
         Args:
             files: List of file objects from Flask request
             folder: Cloudinary folder name
+            upload_fn: Callable(file, folder) -> dict used for each file
+                       (default: CloudinaryUpload.upload_image; lets a stub backend be used)
             
         Returns:
-            list: List of dicts containing image URLs and public_ids
+            list: One dict per input file, in input order: the upload result with
+                  'success': True, or {'success': False, 'error': message}
         """
-        try:
-            uploaded_images = []
-            
-            for file in files:
-                result = CloudinaryUpload.upload_image(file, folder)
-                uploaded_images.append(result)
+        upload_fn = upload_fn or CloudinaryUpload.upload_image
+        files = list(files)
+        
+        def upload(index, file):
+            try:
+                result = dict(upload_fn(file, folder))
+                result['success'] = True
+            except DependencyUnavailable as e:
+                result = {'success': False, 'error': str(e), 'retry_after': e.retry_after}
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            result['index'] = index
+            result['filename'] = getattr(file, 'filename', None)
+            return result
+        
+        if len(files) <= 1:
+            return [upload(index, file) for index, file in enumerate(files)]
+        
+        executor = _get_executor()
+        futures = [executor.submit(upload, index, file) for index, file in enumerate(files)]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def get_resource(public_id):
+        """
+        Look up a stored image with the Admin API
+        
+        Args:
+            public_id: Public ID of the image
             
-            return uploaded_images
-        except Exception as e:
-            raise Exception(f"Failed to upload images: {str(e)}")
+        Returns:
+            dict: Cloudinary resource details (secure_url, bytes, format, width, height, ...)
+        """
+        return CLOUDINARY.call(
+            lambda timeout: dict(cloudinary.api.resource(public_id, timeout=timeout)),
+            idempotent=True
+        )
+    
+    @staticmethod
+    def list_images(prefix, next_cursor=None, max_results=500):
+        """
+        One page of stored images whose public id starts with prefix (Admin API)
+        
+        Returns:
+            dict: Cloudinary response with 'resources' and, if more pages follow, 'next_cursor'
+        """
+        return CLOUDINARY.call(
+            lambda timeout: dict(cloudinary.api.resources(
+                type='upload', resource_type='image', prefix=prefix,
+                max_results=max_results, next_cursor=next_cursor, timeout=timeout
+            )),
+            idempotent=True
+        )
     
     @staticmethod
     def delete_image(public_id):
@@ -89,30 +208,90 @@ class CloudinaryUpload:
             dict: Deletion result
         """
         try:
-            result = cloudinary.uploader.destroy(public_id)
+            result = CLOUDINARY.call(
+                lambda timeout: cloudinary.uploader.destroy(public_id, timeout=timeout),
+                idempotent=True
+            )
             return result
+        except DependencyUnavailable:
+            raise
         except Exception as e:
             raise Exception(f"Failed to delete image: {str(e)}")
     
+    # Maximum public ids per Admin API delete_resources call
+    BULK_DELETE_LIMIT = 100
+
     @staticmethod
-    def delete_multiple_images(public_ids):
+    def delete_multiple_images(public_ids, delete_fn=None):
         """
-        Delete multiple images from Cloudinary
+        Delete multiple images from Cloudinary with bulk Admin API calls
+        
+        Public ids are sent in batches of up to BULK_DELETE_LIMIT per
+        delete_resources call; several batches run concurrently.
         
         Args:
             public_ids: List of public IDs to delete
+            delete_fn: Callable(list of public ids) -> Cloudinary delete_resources
+                       response (default: cloudinary.api.delete_resources, guarded by CLOUDINARY)
             
         Returns:
-            dict: Deletion results
+            dict: public_id -> {'result': 'deleted' | 'not_found' | 'error', 'error'?}
         """
-        try:
-            results = []
-            for public_id in public_ids:
-                result = CloudinaryUpload.delete_image(public_id)
-                results.append(result)
+        delete_fn = delete_fn or (lambda batch: CLOUDINARY.call(
+            lambda timeout: cloudinary.api.delete_resources(batch, timeout=timeout),
+            idempotent=True
+        ))
+        public_ids = list(dict.fromkeys(pid for pid in public_ids if pid))
+        batches = [
+            public_ids[i:i + CloudinaryUpload.BULK_DELETE_LIMIT]
+            for i in range(0, len(public_ids), CloudinaryUpload.BULK_DELETE_LIMIT)
+        ]
+        
+        def delete(batch):
+            try:
+                deleted = (delete_fn(batch) or {}).get('deleted', {})
+            except Exception as e:
+                return {pid: {'result': 'error', 'error': str(e)} for pid in batch}
+            results = {}
+            for pid in batch:
+                status = deleted.get(pid)
+                if status in ('deleted', 'not_found'):
+                    results[pid] = {'result': status}
+                else:
+                    results[pid] = {'result': 'error', 'error': f"Unexpected response: {status}"}
             return results
-        except Exception as e:
-            raise Exception(f"Failed to delete images: {str(e)}")
+        
+        results = {}
+        if len(batches) <= 1:
+            for batch in batches:
+                results.update(delete(batch))
+            return results
+        
+        executor = _get_executor()
+        for batch_results in executor.map(delete, batches):
+            results.update(batch_results)
+        return results
+    
+    @staticmethod
+    def delete_images_by_urls(urls, delete_fn=None):
+        """
+        Delete images given their Cloudinary URLs (see delete_multiple_images)
+        
+        Returns:
+            dict: url -> {'result': 'deleted' | 'not_found' | 'error', 'error'?}
+        """
+        results = {}
+        public_ids = {}
+        for url in urls:
+            try:
+                public_ids[url] = CloudinaryUpload.extract_public_id_from_url(url)
+            except Exception as e:
+                results[url] = {'result': 'error', 'error': str(e)}
+        
+        by_id = CloudinaryUpload.delete_multiple_images(list(public_ids.values()), delete_fn=delete_fn)
+        for url, public_id in public_ids.items():
+            results[url] = by_id.get(public_id, {'result': 'error', 'error': 'Not processed'})
+        return results
     
     @staticmethod
     def extract_public_id_from_url(url):
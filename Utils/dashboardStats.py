@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from Models.adminModels import Admin_And_User
+from Models.enquiryModel import Enquiry
+from Models.landModels import Land
+from Models.sellLandModel import SellLandSubmission
+from Utils.batchSerializer import BatchSerializer
+from Utils.statsCounters import StatsCounters
+
+load_dotenv()
+
+
+class DashboardStats:
+    """
+    Dashboard statistics read from the materialized stats counters
+
+    Counts come from the stats_counters documents (one read per collection,
+    see Utils.statsCounters); only the short "recent" lists and the top
+    enquired lands still query the collections, as small index-backed sorts
+    and one grouped aggregation. Results are memoised for
+    DASHBOARD_STATS_TTL_SECONDS so the admin home page, which loads several
+    dashboards at once, builds each summary only once.
+    """
+
+    ENQUIRY_STATUSES = ['pending', 'contacted', 'in_progress', 'completed', 'cancelled']
+    ENQUIRY_TYPES = ['buy_interest', 'site_visit', 'price_negotiation', 'general_enquiry']
+    LAND_STATUSES = ['available', 'sold', 'pending', 'rejected']
+    SUBMISSION_STATUSES = ['pending', 'approved', 'rejected', 'moved_to_land']
+    SUBMISSION_LAND_TYPES = ['Coconut Land', 'Empty Land', 'Commercial Land', 'House']
+    USER_ROLES = ['admin', 'user']
+
+    ttl = float(os.getenv("DASHBOARD_STATS_TTL_SECONDS", 5))
+    _cache = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _memo(key, compute):
+        """Return a recently computed result for key, or compute and remember it"""
+        now = time.time()
+        with DashboardStats._lock:
+            hit = DashboardStats._cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+        value = compute()
+        if DashboardStats.ttl > 0:
+            with DashboardStats._lock:
+                DashboardStats._cache[key] = (now + DashboardStats.ttl, value)
+        return value
+
+    @staticmethod
+    def invalidate():
+        with DashboardStats._lock:
+            DashboardStats._cache.clear()
+
+    @staticmethod
+    def _counts(buckets, keys):
+        """Pick {key: count} out of a counter dimension with zero defaults (never negative)"""
+        buckets = buckets or {}
+        return {key: max(int(buckets.get(key, 0)), 0) for key in keys}
+
+    @staticmethod
+    def _recent(model, limit, **filters):
+        # limit(0) means "no limit" to mongo, so skip the query outright
+        if not limit:
+            return []
+        return model.objects(**filters).order_by('-created_at').limit(limit)
+
+    @staticmethod
+    def most_enquired_lands(limit=5):
+        """
+        Lands with the most enquiries, grouped in the database over the land index
+
+        Returns:
+            list: [{ land_id, count }] sorted by count (ties by land id)
+        """
+        rows = Enquiry.objects.aggregate([
+            {"$match": {"land": {"$ne": None}}},
+            {"$group": {"_id": "$land", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit}
+        ])
+        return [{"land_id": str(row['_id']), "count": row['count']} for row in rows]
+
+    @staticmethod
+    def enquiry_stats(top_lands=5, recent=10, recent_pending=5):
+        """
+        Summarise the enquiries collection from its counters
+
+        Returns:
+            dict: overview, by_enquiry_type, follow_up_stats, recent_enquiries,
+                  pending_enquiries and most_enquired_lands (the dashboard payload)
+        """
+        def compute():
+            counts = StatsCounters.get('enquiries')
+            by_status = DashboardStats._counts(counts.get('status'), DashboardStats.ENQUIRY_STATUSES)
+            follow_up = DashboardStats._counts(counts.get('is_followed_up'), ['true', 'false'])
+
+            return {
+                "overview": {
+                    "total_enquiries": max(int(counts.get('total', 0)), 0),
+                    "pending_enquiries": by_status['pending'],
+                    "contacted_enquiries": by_status['contacted'],
+                    "in_progress_enquiries": by_status['in_progress'],
+                    "completed_enquiries": by_status['completed'],
+                    "cancelled_enquiries": by_status['cancelled']
+                },
+                "by_enquiry_type": DashboardStats._counts(counts.get('enquiry_type'), DashboardStats.ENQUIRY_TYPES),
+                "follow_up_stats": {
+                    "followed_up": follow_up['true'],
+                    "not_followed_up": follow_up['false']
+                },
+                "recent_enquiries": BatchSerializer.enquiries(DashboardStats._recent(Enquiry, recent)),
+                "pending_enquiries": BatchSerializer.enquiries(
+                    DashboardStats._recent(Enquiry, recent_pending, status='pending')
+                ),
+                "most_enquired_lands": DashboardStats.most_enquired_lands(top_lands)
+            }
+        return DashboardStats._memo(('enquiries', top_lands, recent, recent_pending), compute)
+
+    @staticmethod
+    def land_stats(recent=5):
+        """
+        Summarise the lands collection from its counters
+
+        Returns:
+            dict: { total, by_status: {status: count}, recent: [land json] }
+        """
+        def compute():
+            counts = StatsCounters.get('lands')
+            return {
+                "total": max(int(counts.get('total', 0)), 0),
+                "by_status": DashboardStats._counts(counts.get('status'), DashboardStats.LAND_STATUSES),
+                "recent": BatchSerializer.lands(DashboardStats._recent(Land, recent))
+            }
+        return DashboardStats._memo(('lands', recent), compute)
+
+    @staticmethod
+    def submission_stats(recent=10, recent_pending=5):
+        """
+        Summarise the sell land submissions collection from its counters
+
+        Returns:
+            dict: { total, by_status, by_land_type, recent, recent_pending }
+        """
+        def compute():
+            counts = StatsCounters.get('sell_land_submissions')
+            return {
+                "total": max(int(counts.get('total', 0)), 0),
+                "by_status": DashboardStats._counts(counts.get('status'), DashboardStats.SUBMISSION_STATUSES),
+                "by_land_type": DashboardStats._counts(counts.get('land_type'), DashboardStats.SUBMISSION_LAND_TYPES),
+                "recent": BatchSerializer.submissions(DashboardStats._recent(SellLandSubmission, recent)),
+                "recent_pending": BatchSerializer.submissions(
+                    DashboardStats._recent(SellLandSubmission, recent_pending, status='pending')
+                )
+            }
+        return DashboardStats._memo(('submissions', recent, recent_pending), compute)
+
+    @staticmethod
+    def user_stats(recent=5):
+        """
+        Summarise the users collection from its counters
+
+        Returns:
+            dict: { total, by_role, recent: [user json] }
+        """
+        def compute():
+            counts = StatsCounters.get('users')
+            return {
+                "total": max(int(counts.get('total', 0)), 0),
+                "by_role": DashboardStats._counts(counts.get('role'), DashboardStats.USER_ROLES),
+                "recent": [user.to_json() for user in DashboardStats._recent(Admin_And_User, recent)]
+            }
+        return DashboardStats._memo(('users', recent), compute)
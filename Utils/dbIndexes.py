@@ -0,0 +1,82 @@
+import logging
+from Models.adminModels import Admin_And_User
+from Models.enquiryModel import Enquiry
+from Models.landModels import Land
+from Models.sellLandModel import SellLandSubmission
+from Models.statsCounterModel import StatsCounter
+from Models.jobModel import Job
+from Models.imageAssetModel import ImageAsset
+from Models.collectionVersionModel import CollectionVersion
+
+
+class DbIndexes:
+    """
+    Startup index management
+
+    Creates the indexes declared in each model's meta and explains the hot
+    Land queries, logging a warning for any plan that would scan the whole
+    collection (COLLSCAN) so a missing index shows up at deploy time rather
+    than as slow pages later.
+    """
+
+    MODELS = [Land, Enquiry, SellLandSubmission, Admin_And_User, StatsCounter, Job, ImageAsset, CollectionVersion]
+
+    # name -> queryset factory, mirroring the query shapes used by the controllers
+    HOT_QUERIES = {
+        "available lands (public listing)":
+            lambda: Land.objects(status='available').order_by('-created_at', '-id').limit(21),
+        "available lands by property type":
+            lambda: Land.objects(status='available', property_type='land').order_by('-created_at', '-id').limit(21),
+        "available lands by price range":
+            lambda: Land.objects(status='available', price__gte=0, price__lte=1000000).limit(21),
+        "available lands by size range":
+            lambda: Land.objects(status='available', size__gte=1, size__lte=1000).limit(21),
+        "admin lands by status":
+            lambda: Land.objects(status='pending').order_by('-created_at'),
+        "admin lands (all)":
+            lambda: Land.objects.order_by('-created_at'),
+        "landing urgent sales":
+            lambda: Land.objects(is_urgent=True).order_by('+urgent_priority', '-updated_at').limit(5),
+    }
+
+    @staticmethod
+    def sync():
+        """Create any declared index that does not exist yet (existing ones are left alone)"""
+        for model in DbIndexes.MODELS:
+            try:
+                model.ensure_indexes()
+            except Exception as e:
+                logging.error(f"Failed to ensure indexes for {model.__name__}: {str(e)}")
+
+    @staticmethod
+    def _stages(plan):
+        """Yield every stage name of an explain() plan tree"""
+        if not isinstance(plan, dict):
+            return
+        if 'stage' in plan:
+            yield plan['stage']
+        for key in ('inputStage', 'queryPlan'):
+            yield from DbIndexes._stages(plan.get(key))
+        for child in plan.get('inputStages', []):
+            yield from DbIndexes._stages(child)
+
+    @staticmethod
+    def check_hot_queries():
+        """
+        Explain each hot query and warn about collection scans
+
+        Returns:
+            list: Names of the queries whose winning plan is a COLLSCAN
+        """
+        scans = []
+        for name, build in DbIndexes.HOT_QUERIES.items():
+            try:
+                explain = build().explain()
+            except Exception as e:
+                logging.warning(f"Could not explain query '{name}': {str(e)}")
+                continue
+            plan = explain.get('queryPlanner', {}).get('winningPlan', {})
+            if 'COLLSCAN' in DbIndexes._stages(plan):
+                logging.warning(f"Query '{name}' is not index-backed (COLLSCAN)")
+                scans.append(name)
+        return scans
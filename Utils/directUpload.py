@@ -0,0 +1,147 @@
+import hmac
+import os
+import time
+import uuid
+import jwt
+import cloudinary
+import cloudinary.utils
+from dotenv import load_dotenv
+from Utils.uploadStream import UPLOAD_MAX_FILE_BYTES
+
+load_dotenv()
+
+# How long issued upload parameters (and their upload token) stay valid
+DIRECT_UPLOAD_TTL_SECONDS = int(os.getenv("DIRECT_UPLOAD_TTL_SECONDS", 600))
+
+
+class DirectUploadError(Exception):
+    """Invalid, expired or foreign direct upload; callers answer 400"""
+
+
+class DirectUpload:
+    """
+    Signed browser-to-Cloudinary uploads
+
+    sign() issues the form fields for one upload to Cloudinary's upload API:
+    the server chooses the public id, folder, formats and incoming
+    transformation, and signs them with the API secret, so the client cannot
+    change any of them. Alongside it goes an upload token (a short-lived JWT
+    naming that public id, the admin and the target land) that the confirm
+    step checks together with Cloudinary's signature of the upload response.
+
+    Everything here is pure computation over the given credentials, so it can
+    be exercised without network access.
+    """
+
+    FOLDER = "gem_lands"
+    ALLOWED_FORMATS = ("jpg", "jpeg", "png", "webp", "gif")
+    # Same incoming transformation as server-side uploads (CloudinaryUpload.upload_image)
+    TRANSFORMATION = "c_limit,h_800,w_1200/q_auto:good"
+    TOKEN_TYPE = "direct_upload"
+
+    @staticmethod
+    def _credentials(api_key=None, api_secret=None, cloud_name=None):
+        config = cloudinary.config()
+        return api_key or config.api_key, api_secret or config.api_secret, cloud_name or config.cloud_name
+
+    @staticmethod
+    def _token_secret():
+        return os.getenv("DIRECT_UPLOAD_SECRET") or os.getenv("JWT_SECRET")
+
+    @staticmethod
+    def sign(user_id, land_id=None, now=None, api_key=None, api_secret=None, cloud_name=None):
+        """
+        Issue signed upload parameters for one image
+
+        Args:
+            user_id: Admin requesting the upload
+            land_id: Land the image will be attached to on confirm (optional)
+            now: Unix time to sign with (default: current time)
+
+        Returns:
+            dict: { upload_url, fields (form fields to post with the file), upload_token,
+                    public_id, max_bytes, expires_at }
+        """
+        api_key, api_secret, cloud_name = DirectUpload._credentials(api_key, api_secret, cloud_name)
+        if not (api_key and api_secret and cloud_name):
+            raise DirectUploadError("Cloudinary credentials are not configured")
+
+        now = int(now if now is not None else time.time())
+        name = uuid.uuid4().hex
+        params = {
+            "timestamp": now,
+            "folder": DirectUpload.FOLDER,
+            "public_id": name,
+            "allowed_formats": ",".join(DirectUpload.ALLOWED_FORMATS),
+            "transformation": DirectUpload.TRANSFORMATION,
+            "overwrite": "false",
+        }
+        params["signature"] = cloudinary.utils.api_sign_request(
+            params, api_secret, cloudinary.config().signature_algorithm
+        )
+        params["api_key"] = api_key
+
+        expires_at = now + DIRECT_UPLOAD_TTL_SECONDS
+        public_id = f"{DirectUpload.FOLDER}/{name}"
+        token = jwt.encode({
+            "typ": DirectUpload.TOKEN_TYPE,
+            "pid": public_id,
+            "sub": str(user_id),
+            "land": str(land_id) if land_id else None,
+            "iat": now,
+            "exp": expires_at,
+        }, DirectUpload._token_secret(), algorithm="HS256")
+
+        return {
+            "upload_url": f"https://api.cloudinary.com/v1_1/{cloud_name}/image/upload",
+            "fields": params,
+            "upload_token": token,
+            "public_id": public_id,
+            "max_bytes": UPLOAD_MAX_FILE_BYTES,
+            "expires_at": expires_at,
+        }
+
+    @staticmethod
+    def verify_token(token, user_id, now=None):
+        """
+        Check an upload token issued by sign() to this admin
+
+        Returns:
+            dict: The token claims (pid, land, ...)
+
+        Raises:
+            DirectUploadError: If the token is invalid, expired or was issued to someone else
+        """
+        try:
+            claims = jwt.decode(
+                token or "", DirectUpload._token_secret(), algorithms=["HS256"],
+                options={"verify_exp": False}
+            )
+        except jwt.InvalidTokenError:
+            raise DirectUploadError("Invalid upload token")
+        now = now if now is not None else time.time()
+        if claims.get("typ") != DirectUpload.TOKEN_TYPE:
+            raise DirectUploadError("Invalid upload token")
+        if claims.get("exp", 0) < now:
+            raise DirectUploadError("Upload token expired")
+        if claims.get("sub") != str(user_id):
+            raise DirectUploadError("Upload token was issued to another user")
+        return claims
+
+    @staticmethod
+    def verify_upload_result(claims, public_id, version, signature, api_secret=None):
+        """
+        Check that an upload result reported by the client came from Cloudinary
+        and is the upload the token was issued for
+
+        Raises:
+            DirectUploadError: If the public id differs or Cloudinary's signature does not match
+        """
+        if public_id != claims.get("pid"):
+            raise DirectUploadError("Upload result does not match the upload token")
+        _, api_secret, _ = DirectUpload._credentials(api_secret=api_secret)
+        expected = cloudinary.utils.api_sign_request(
+            {"public_id": public_id, "version": version}, api_secret, cloudinary.config().signature_algorithm
+        )
+        if not signature or not hmac.compare_digest(str(signature), expected):
+            raise DirectUploadError("Invalid upload signature")
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timezone
+from flask import request, make_response
+from mongoengine import signals
+from Models.adminModels import Admin_And_User
+from Models.collectionVersionModel import CollectionVersion
+from Models.landModels import Land
+from Models.siteContentModels import LandingContent
+from Utils.imageStorage import get_storage
+
+
+class CollectionVersions:
+    """
+    Per-collection write counters (collection_versions)
+
+    Every save or delete of a tracked document bumps its collection's counter,
+    so "has anything in this collection changed?" is one indexed read. Used as
+    the version stamp of list responses, whose content depends on many
+    documents at once.
+    """
+
+    TRACKED = {
+        Land: 'lands',
+        Admin_And_User: 'users',
+        LandingContent: 'landing',
+    }
+
+    _connected = False
+
+    @staticmethod
+    def bump(key):
+        CollectionVersion._get_collection().update_one(
+            {'key': key},
+            {
+                '$inc': {'version': 1},
+                '$set': {'updated_at': datetime.now(timezone.utc)},
+                '$setOnInsert': {'epoch': uuid.uuid4().hex[:8]}
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def _on_write(sender, document, **kwargs):
+        key = CollectionVersions.TRACKED.get(sender)
+        if key:
+            try:
+                CollectionVersions.bump(key)
+            except Exception as e:
+                logging.error(f"Failed to bump collection version of {key}: {str(e)}")
+
+    @staticmethod
+    def connect():
+        """Register the document signal handlers (idempotent)"""
+        if CollectionVersions._connected:
+            return
+        for model in CollectionVersions.TRACKED:
+            signals.post_save.connect(CollectionVersions._on_write, sender=model, weak=False)
+            signals.post_delete.connect(CollectionVersions._on_write, sender=model, weak=False)
+        CollectionVersions._connected = True
+
+    @staticmethod
+    def stamps(*keys):
+        """
+        Current counters of the given collections with one query
+
+        Returns:
+            dict: key -> {'version', 'epoch', 'updated_at'} (missing keys: never written since tracking began)
+        """
+        docs = CollectionVersion._get_collection().find(
+            {'key': {'$in': list(keys)}}, {'_id': 0, 'key': 1, 'version': 1, 'epoch': 1, 'updated_at': 1}
+        )
+        return {doc['key']: doc for doc in docs}
+
+
+class HttpCache:
+    """
+    Conditional GET helpers: strong ETags, Last-Modified and Cache-Control
+
+    Controllers compute an ETag from version stamps (a document's updated_at,
+    CollectionVersions counters) with a cheap projected lookup and call
+    not_modified() before loading or serializing anything; on a match the
+    client gets an empty 304. Bump SCHEMA whenever a cached payload's shape
+    changes, so clients holding the old shape refetch.
+    """
+
+    SCHEMA = "2"
+
+    # Cache-Control per route; clients revalidate with If-None-Match after max-age
+    LAND_DETAIL = "public, max-age=60"
+    LAND_LIST = "public, max-age=30"
+    LANDING = "public, max-age=60, stale-while-revalidate=300"
+
+    @staticmethod
+    def etag(*parts):
+        """Strong ETag (quoted) over the given version parts, the payload schema and the image backend"""
+        raw = "|".join(str(part) for part in (HttpCache.SCHEMA, get_storage().name) + parts)
+        return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def stamp(doc):
+        """ETag part of a CollectionVersions stamp (None if the collection was never written)"""
+        return f"{doc['epoch']}:{doc['version']}" if doc else None
+
+    @staticmethod
+    def latest(*timestamps):
+        """Newest of the given datetimes (naive values are UTC), or None"""
+        values = [t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in timestamps if t]
+        return max(values) if values else None
+
+    @staticmethod
+    def headers(etag, last_modified=None, cache_control=None):
+        headers = {"ETag": etag}
+        if last_modified:
+            headers["Last-Modified"] = last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT")
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        return headers
+
+    @staticmethod
+    def not_modified(etag, last_modified=None, cache_control=None):
+        """
+        Answer 304 if the client already holds this representation
+
+        If-None-Match takes precedence; If-Modified-Since is only used when the
+        request has no If-None-Match.
+
+        Returns:
+            Response: Empty 304 carrying the validators, or None if the full response is needed
+        """
+        if request.if_none_match:
+            fresh = request.if_none_match.contains_weak(etag.strip('"'))
+        elif request.if_modified_since and last_modified:
+            fresh = last_modified.replace(microsecond=0) <= request.if_modified_since
+        else:
+            fresh = False
+        if not fresh:
+            return None
+        response = make_response("", 304)
+        response.headers.update(HttpCache.headers(etag, last_modified, cache_control))
+        return response
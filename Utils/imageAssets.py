@@ -0,0 +1,212 @@
+import logging
+from datetime import datetime, timezone
+from mongoengine import signals
+from mongoengine.errors import NotUniqueError
+from Models.imageAssetModel import ImageAsset
+from Models.landModels import Land
+from Utils.cloudinaryUpload import CloudinaryUpload
+from Utils.imageStorage import get_storage
+from Utils.jobQueue import JobQueue
+
+
+class ImageAssets:
+    """
+    Content-addressed image registry (image_assets collection)
+
+    Every upload is identified by the SHA-256 computed while it was streamed
+    (Utils.uploadStream), so bytes that are already stored are answered from
+    the registry instead of being uploaded again. Land document signals keep
+    each asset's ref_count equal to the number of lands listing its url, and
+    image cleanup only destroys assets nobody references any more.
+    """
+
+    _SNAPSHOT_ATTR = '_image_urls_snapshot'
+    _connected = False
+
+    @staticmethod
+    def find(sha256):
+        """Return the stored asset with this content hash (marking it as just used), or None"""
+        if not sha256:
+            return None
+        return ImageAsset.objects(sha256=sha256, backend=get_storage().name).modify(
+            new=True,
+            set__last_used_at=datetime.now(timezone.utc)
+        )
+
+    @staticmethod
+    def register(sha256, result, size=None):
+        """
+        Record a freshly stored upload
+
+        If the same bytes were registered meanwhile (concurrent upload), the
+        earlier asset wins and the duplicate just stored is deleted again (or
+        queued for deletion if the storage call fails).
+        Without a sha256 computed by this server (direct uploads) the image is
+        recorded for reference counting only and never deduplicated against.
+
+        Returns:
+            ImageAsset: The asset now registered for sha256
+        """
+        storage = get_storage()
+        now = datetime.now(timezone.utc)
+        if not sha256:
+            return ImageAsset(
+                backend=storage.name, public_id=result['public_id'], url=result['url'], bytes=size,
+                width=result.get('width'), height=result.get('height'), format=result.get('format'),
+                ref_count=0, created_at=now, last_used_at=now
+            ).save()
+        fields = {
+            'public_id': result['public_id'],
+            'url': result['url'],
+            'bytes': size,
+            'width': result.get('width'),
+            'height': result.get('height'),
+            'format': result.get('format'),
+            'ref_count': 0,
+            'created_at': now,
+        }
+        try:
+            asset = ImageAsset.objects(sha256=sha256, backend=storage.name).modify(
+                upsert=True,
+                new=True,
+                set__last_used_at=now,
+                **{f"set_on_insert__{name}": value for name, value in fields.items() if value is not None}
+            )
+        except NotUniqueError:
+            # A concurrent upsert inserted first; its asset is the canonical one
+            asset = ImageAssets.find(sha256)
+            if asset is None:
+                raise
+        if asset.public_id != result['public_id']:
+            ImageAssets._discard(result)
+        return asset
+
+    @staticmethod
+    def _discard(result):
+        """Delete an upload that lost to an existing asset, or queue its deletion"""
+        try:
+            res = get_storage().delete(result['public_id'])
+            if res['result'] in ('deleted', 'not_found'):
+                return
+            error = res.get('error')
+        except Exception as e:
+            error = str(e)
+        logging.warning(f"Could not delete duplicate upload {result['public_id']}: {error}; queued for deletion")
+        JobQueue.enqueue('land_images.delete', {"land_id": None, "image_urls": [result['url']]})
+
+    @staticmethod
+    def upload(files, infos, folder="gem_lands"):
+        """
+        Store uploaded files, reusing existing assets for content already stored
+
+        Args:
+            files: FileStorage objects from the request
+            infos: ImageSniffer.inspect() result of each file (sha256, size)
+            folder: Storage folder for new images
+
+        Returns:
+            list: One result per file in input order, shaped like
+                  CloudinaryUpload.upload_multiple_images results plus
+                  'sha256', 'bytes' and 'deduplicated'
+        """
+        results = [None] * len(files)
+        pending = {}  # sha256 (or index for unhashed files) -> input indexes with that content
+        for index, (file, info) in enumerate(zip(files, infos)):
+            asset = ImageAssets.find(info['sha256'])
+            if asset:
+                results[index] = dict(asset.to_upload_result(), success=True, deduplicated=True)
+            else:
+                pending.setdefault(info['sha256'] or index, []).append(index)
+
+        # Identical files within the request are uploaded once
+        first = [indexes[0] for indexes in pending.values()]
+        uploaded = CloudinaryUpload.upload_multiple_images(
+            [files[i] for i in first], folder=folder, upload_fn=get_storage().put
+        )
+        for indexes, result in zip(pending.values(), uploaded):
+            sha256 = infos[indexes[0]]['sha256']
+            deduplicated = False
+            if result['success'] and sha256:
+                try:
+                    asset = ImageAssets.register(sha256, result, infos[indexes[0]]['size'])
+                    deduplicated = asset.public_id != result['public_id']
+                    result = dict(result, **asset.to_upload_result())
+                except Exception as e:
+                    logging.error(f"Failed to register image asset {sha256}: {str(e)}")
+            for n, index in enumerate(indexes):
+                results[index] = dict(result, deduplicated=result['success'] and (deduplicated or n > 0))
+
+        for index, (file, info) in enumerate(zip(files, infos)):
+            results[index].update(index=index, filename=file.filename, sha256=info['sha256'], bytes=info['size'])
+        return results
+
+    # Reference counting
+
+    @staticmethod
+    def _adjust(urls, delta):
+        if urls:
+            ImageAsset.objects(url__in=list(urls)).update(inc__ref_count=delta)
+
+    @staticmethod
+    def _urls(land):
+        return set(land._data.get('images_urls') or [])
+
+    @staticmethod
+    def _on_init(sender, document, **kwargs):
+        if document.pk is not None:
+            setattr(document, ImageAssets._SNAPSHOT_ATTR, ImageAssets._urls(document))
+
+    @staticmethod
+    def _on_save(sender, document, created=False, **kwargs):
+        try:
+            current = ImageAssets._urls(document)
+            previous = set() if created else getattr(document, ImageAssets._SNAPSHOT_ATTR, set())
+            ImageAssets._adjust(current - previous, 1)
+            ImageAssets._adjust(previous - current, -1)
+            setattr(document, ImageAssets._SNAPSHOT_ATTR, current)
+        except Exception as e:
+            logging.error(f"Failed to update image reference counts: {str(e)}")
+
+    @staticmethod
+    def _on_delete(sender, document, **kwargs):
+        try:
+            snapshot = getattr(document, ImageAssets._SNAPSHOT_ATTR, None)
+            ImageAssets._adjust(snapshot if snapshot is not None else ImageAssets._urls(document), -1)
+        except Exception as e:
+            logging.error(f"Failed to update image reference counts: {str(e)}")
+
+    @staticmethod
+    def connect():
+        """Register the Land signal handlers (idempotent)"""
+        if ImageAssets._connected:
+            return
+        signals.post_init.connect(ImageAssets._on_init, sender=Land, weak=False)
+        signals.post_save.connect(ImageAssets._on_save, sender=Land, weak=False)
+        signals.post_delete.connect(ImageAssets._on_delete, sender=Land, weak=False)
+        ImageAssets._connected = True
+
+    @staticmethod
+    def release_unreferenced(urls, released_at):
+        """
+        Drop the registry entries of the given images that no land references
+
+        An asset is only dropped if its ref_count is zero and no upload reused
+        it after released_at; the check and the removal are one atomic delete.
+
+        Returns:
+            tuple: (urls whose stored image may now be deleted, urls still in use).
+                   URLs without a registry entry (uploaded before deduplication)
+                   are returned as deletable.
+        """
+        urls = list(dict.fromkeys(urls))
+        assets = {asset.url: asset for asset in ImageAsset.objects(url__in=urls).only('id', 'url')}
+        deletable, kept = [], []
+        for url in urls:
+            asset = assets.get(url)
+            if asset is None:
+                deletable.append(url)
+            elif ImageAsset.objects(id=asset.id, ref_count__lte=0, last_used_at__lte=released_at).delete():
+                deletable.append(url)
+            else:
+                kept.append(url)
+        return deletable, kept
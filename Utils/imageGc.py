@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from Models.imageAssetModel import ImageAsset
+from Models.landModels import Land
+from Models.siteContentModels import LandingContent
+from Utils.imageStorage import get_storage
+from Utils.jobQueue import JobQueue
+
+load_dotenv()
+
+
+class ImageGc:
+    """
+    Garbage collection of stored land images nothing refers to
+
+    Images uploaded but never attached to a land, or dropped from one by an
+    edit, stay in storage forever. A GC run (job 'images.gc') first collects
+    the public ids referenced by Land.images_urls and the landing page content
+    into a set of 8-byte digests, then walks the storage listing page by page
+    and deletes, in bulk, every image that is not referenced, is older than
+    the grace period and is not held by the image registry (ref_count > 0 or
+    reused by an upload within the grace period). Progress is checkpointed
+    after each page, so a retried run resumes where it stopped. A dry run
+    only reports what would be deleted. If any stored reference points into
+    this backend but cannot be resolved to a public id, the run degrades to
+    a dry run: an unknown reference must never make an image look unused.
+    """
+
+    GRACE_HOURS = float(os.getenv("IMAGE_GC_GRACE_HOURS", 24))
+    PAGE_SIZE = int(os.getenv("IMAGE_GC_PAGE_SIZE", 500))
+    # Public ids listed in the report (dry runs show what would go)
+    REPORT_LIMIT = 1000
+
+    @staticmethod
+    def _key(public_id):
+        # Compact stand-in for a public id; a collision can only keep an image, never delete one
+        return hashlib.blake2b(public_id.encode(), digest_size=8).digest()
+
+    @staticmethod
+    def _strings(value):
+        """Every string nested in a document (dicts and lists)"""
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from ImageGc._strings(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from ImageGc._strings(item)
+
+    @staticmethod
+    def referenced_keys(storage):
+        """
+        Digests of all public ids in use, read with streaming projected cursors
+
+        Returns:
+            tuple: (set of ImageGc._key() of every referenced public id of this storage backend,
+                    list of referenced URLs of this backend whose public id could not be parsed)
+        """
+        keys = set()
+        unresolved = []
+
+        def add(url):
+            try:
+                public_id = storage.public_id_from_url(url)
+            except Exception:
+                public_id = None
+            if public_id:
+                keys.add(ImageGc._key(public_id))
+            elif storage.owns_url(url):
+                unresolved.append(url)
+
+        for land in Land._get_collection().find({}, {'images_urls': 1}, batch_size=1000):
+            for url in land.get('images_urls') or []:
+                add(url)
+        for content in LandingContent._get_collection().find({}, {'_id': 0}):
+            for value in ImageGc._strings(content):
+                add(value)
+        return keys, unresolved
+
+    @staticmethod
+    def _collectable(public_ids, cutoff, dry_run, backend):
+        """
+        Split candidates by the image registry: ids without an asset, or whose
+        asset is unreferenced and unused since cutoff, may go (their asset entry
+        is removed atomically unless dry_run); the others are in use.
+
+        Returns:
+            tuple: (collectable public ids, public ids still in use)
+        """
+        assets = {a.public_id: a for a in ImageAsset.objects(public_id__in=public_ids, backend=backend).only('id', 'public_id')}
+        if not assets:
+            return public_ids, []
+        free = {
+            a.public_id for a in ImageAsset.objects(
+                public_id__in=list(assets), backend=backend, ref_count__lte=0, last_used_at__lte=cutoff
+            ).only('public_id')
+        }
+        collectable, in_use = [], []
+        for public_id in public_ids:
+            asset = assets.get(public_id)
+            if asset is None:
+                collectable.append(public_id)
+            elif public_id in free and (dry_run or ImageAsset.objects(
+                    id=asset.id, ref_count__lte=0, last_used_at__lte=cutoff).delete()):
+                collectable.append(public_id)
+            else:
+                in_use.append(public_id)
+        return collectable, in_use
+
+    @staticmethod
+    def run(payload, job):
+        """
+        Job handler of 'images.gc'
+        Payload: { dry_run, grace_hours, folder, started_at }
+        """
+        dry_run = payload.get('dry_run', True)
+        folder = payload.get('folder', 'gem_lands')
+        started_at = datetime.fromisoformat(payload['started_at'])
+        # Fixed for the whole run, so a resumed attempt applies the same cutoff
+        cutoff = started_at - timedelta(hours=payload.get('grace_hours', ImageGc.GRACE_HOURS))
+
+        progress = dict({
+            'cursor': None, 'pages': 0, 'scanned': 0, 'referenced': 0, 'recent': 0, 'in_use': 0,
+            'collectable': 0, 'deleted': 0, 'failed': 0, 'public_ids': [], 'errors': []
+        }, **(job.progress or {}))
+        if progress['pages'] and not progress['cursor']:
+            return ImageGc._report(progress, dry_run)
+
+        storage = get_storage()
+        referenced, unresolved = ImageGc.referenced_keys(storage)
+        if unresolved and not dry_run:
+            logging.error(f"Image GC: {len(unresolved)} referenced URL(s) could not be parsed; not deleting anything")
+            dry_run = True
+            progress['delete_skipped'] = "Some referenced image URLs could not be parsed"
+            progress['unresolved_urls'] = unresolved[:20]
+
+        while True:
+            images, next_cursor = storage.list_page(folder, progress['cursor'], ImageGc.PAGE_SIZE)
+            candidates = []
+            for image in images:
+                progress['scanned'] += 1
+                if ImageGc._key(image['public_id']) in referenced:
+                    progress['referenced'] += 1
+                elif image['created_at'] > cutoff:
+                    progress['recent'] += 1
+                else:
+                    candidates.append(image['public_id'])
+
+            if candidates:
+                candidates, in_use = ImageGc._collectable(candidates, cutoff, dry_run, storage.name)
+                progress['in_use'] += len(in_use)
+                progress['collectable'] += len(candidates)
+                room = ImageGc.REPORT_LIMIT - len(progress['public_ids'])
+                progress['public_ids'].extend(candidates[:max(room, 0)])
+
+            if candidates and not dry_run:
+                results = storage.bulk_delete(candidates)
+                for public_id, res in results.items():
+                    if res['result'] in ('deleted', 'not_found'):
+                        progress['deleted'] += 1
+                    else:
+                        progress['failed'] += 1
+                        if len(progress['errors']) < 20:
+                            progress['errors'].append({"public_id": public_id, "error": res.get('error')})
+
+            progress['cursor'] = next_cursor
+            progress['pages'] += 1
+            JobQueue.save_progress(job, progress)
+            if not next_cursor:
+                break
+
+        logging.info(f"Image GC ({'dry run' if dry_run else 'delete'}) finished: "
+                     f"{progress['scanned']} scanned, {progress['collectable']} unreferenced, {progress['deleted']} deleted")
+        return ImageGc._report(progress, dry_run)
+
+    @staticmethod
+    def _report(progress, dry_run):
+        report = {key: value for key, value in progress.items() if key != 'cursor'}
+        report['dry_run'] = dry_run
+        return report
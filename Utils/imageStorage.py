@@ -0,0 +1,365 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import cloudinary
+import cloudinary.utils
+from Utils.cloudinaryUpload import CloudinaryUpload
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is only needed by the local backend, which refuses to start without it
+    Image = ImageOps = None
+
+load_dotenv()
+
+# Named renditions of every stored image
+VARIANTS = {
+    'thumbnail': {'width': 320, 'height': 240, 'crop': 'fill'},
+    'card': {'width': 640, 'height': 427, 'crop': 'fill'},
+    'full': {'width': 1200, 'height': 800, 'crop': 'limit'},
+}
+
+
+class ImageStorage(ABC):
+    """
+    Interface of an image storage backend (see get_storage)
+
+    Images are addressed by public id; the URL of each rendition is derived
+    from it with url_for, so payloads never need to store more than the id
+    (or the 'full' URL, from which the id can be recovered).
+    """
+
+    name = None
+    # Alternative formats url_for can deliver, besides the default
+    formats = ()
+    # Whether clients can upload straight to the backend (see Utils.directUpload)
+    direct_upload = False
+
+    @abstractmethod
+    def put(self, file, folder="gem_lands"):
+        """
+        Store an uploaded image
+
+        Returns:
+            dict: { url (full variant), public_id, width, height, format }
+        """
+
+    def delete(self, public_id):
+        """Returns: {'result': 'deleted' | 'not_found' | 'error', 'error'?}"""
+        return self.bulk_delete([public_id]).get(public_id, {'result': 'error', 'error': 'Not processed'})
+
+    @abstractmethod
+    def bulk_delete(self, public_ids):
+        """Returns: dict public_id -> {'result': 'deleted' | 'not_found' | 'error', 'error'?}"""
+
+    @abstractmethod
+    def url_for(self, public_id, variant='full', format=None):
+        """URL of one variant of an image, optionally in another format ('webp', 'avif')"""
+
+    @abstractmethod
+    def list_page(self, folder="gem_lands", cursor=None, limit=500):
+        """
+        One page of the images stored under folder, for garbage collection
+
+        Returns:
+            tuple: ([{public_id, created_at (aware datetime)}], cursor of the next page or None)
+        """
+
+    @abstractmethod
+    def public_id_from_url(self, url):
+        """Recover the public id from a URL produced by this backend, any variant (None if foreign)"""
+
+    @abstractmethod
+    def owns_url(self, url):
+        """
+        Whether url points into this backend's storage, parseable or not
+
+        Garbage collection must not delete anything while a stored reference
+        it owns cannot be resolved to a public id.
+        """
+
+    def variants(self, url, sizes=None):
+        """
+        Renditions of a stored image, for responsive <img srcset>/<picture> markup
+
+        Args:
+            url: Stored image URL (as kept in Land.images_urls)
+            sizes: Only these sizes, e.g. ('thumbnail', 'card') for list payloads
+
+        Returns:
+            dict: With sizes, just {size: url}. Otherwise { public_id, original,
+                  thumbnail, card, full, webp: {variant: url} | None, avif: {variant: url} | None }.
+                  URLs this backend did not produce (external links, other backends)
+                  are returned unchanged for every size.
+        """
+        names = sizes or tuple(VARIANTS)
+        try:
+            public_id = self.public_id_from_url(url)
+            if public_id:
+                urls = {variant: self.url_for(public_id, variant) for variant in names}
+                if sizes:
+                    return urls
+                for image_format in ('webp', 'avif'):
+                    urls[image_format] = {
+                        variant: self.url_for(public_id, variant, format=image_format) for variant in VARIANTS
+                    } if image_format in self.formats else None
+                return dict(urls, public_id=public_id, original=url)
+        except Exception as e:
+            logging.warning(f"Could not build variants for {url}: {str(e)}")
+        urls = {variant: url for variant in names}
+        return urls if sizes else dict(urls, public_id=None, original=url, webp=None, avif=None)
+
+    def delete_urls(self, urls):
+        """
+        Delete images given their URLs (URLs of other backends are skipped)
+
+        Returns:
+            dict: url -> {'result': 'deleted' | 'not_found' | 'skipped' | 'error', 'error'?}
+        """
+        results = {}
+        public_ids = {}
+        for url in urls:
+            public_id = None
+            try:
+                public_id = self.public_id_from_url(url)
+            except Exception:
+                pass
+            if public_id:
+                public_ids[url] = public_id
+            else:
+                results[url] = {'result': 'skipped', 'error': 'Not an image of this storage backend'}
+        by_id = self.bulk_delete(list(public_ids.values())) if public_ids else {}
+        for url, public_id in public_ids.items():
+            results[url] = by_id.get(public_id, {'result': 'error', 'error': 'Not processed'})
+        return results
+
+
+class CloudinaryStorage(ImageStorage):
+    """Images on Cloudinary; variants are on-the-fly transformation URLs"""
+
+    name = 'cloudinary'
+    formats = ('webp', 'avif')
+    direct_upload = True
+
+    def put(self, file, folder="gem_lands"):
+        return CloudinaryUpload.upload_image(file, folder)
+
+    def bulk_delete(self, public_ids):
+        return CloudinaryUpload.delete_multiple_images(public_ids)
+
+    def url_for(self, public_id, variant='full', format=None):
+        delivery = {'quality': 'auto'}
+        if format == 'webp':
+            delivery['fetch_format'] = 'webp'
+        elif format is None:
+            delivery['fetch_format'] = 'auto'
+        options = {'secure': True, 'transformation': [VARIANTS[variant], delivery]}
+        if format == 'avif':
+            options['format'] = 'avif'
+        return cloudinary.utils.cloudinary_url(public_id, **options)[0]
+
+    def list_page(self, folder="gem_lands", cursor=None, limit=500):
+        response = CloudinaryUpload.list_images(f"{folder}/", next_cursor=cursor, max_results=limit)
+        images = [
+            {
+                'public_id': resource['public_id'],
+                'created_at': datetime.fromisoformat(resource['created_at'].replace('Z', '+00:00'))
+            }
+            for resource in response.get('resources', [])
+        ]
+        return images, response.get('next_cursor')
+
+    # One transformation component of a delivery URL, e.g. c_fill,h_427,w_640 or f_auto,q_auto
+    _TRANSFORMATION = re.compile(r'[a-z]{1,3}_[^,/]+(?:,[a-z]{1,3}_[^,/]+)*')
+
+    def owns_url(self, url):
+        if not isinstance(url, str) or '/image/upload/' not in url:
+            return False
+        cloud_name = cloudinary.config().cloud_name
+        return not cloud_name or f"/{cloud_name}/image/upload/" in url
+
+    def public_id_from_url(self, url):
+        # Upload results (.../upload/v<version>/<public_id>.<ext>) and url_for variants
+        # (.../upload/<transformation>/.../v1/<public_id>[.<ext>]) both carry a version
+        # segment; the transformation components before it are skipped
+        if not self.owns_url(url):
+            return None
+        segments = url.split('?', 1)[0].split('/image/upload/', 1)[1].split('/')
+        for index, segment in enumerate(segments):
+            if re.fullmatch(r'v\d+', segment):
+                path = segments[index + 1:]
+                break
+            if not self._TRANSFORMATION.fullmatch(segment):
+                return None
+        else:
+            return None
+        if not path or not all(path):
+            return None
+        path[-1] = path[-1].rsplit('.', 1)[0]
+        return '/'.join(path)
+
+
+class LocalDiskStorage(ImageStorage):
+    """
+    Images on the local filesystem, for development, CI and offline benchmarks
+
+    Each image gets a directory <root>/<public_id>/ holding the original and
+    one JPEG + WebP file per variant, rendered with Pillow on a shared worker
+    pool. The variant files (never the original) are served under the path of
+    base_url (Routes.mediaRoutes) with long-lived cache headers, since a public
+    id never changes content.
+    """
+
+    name = 'local'
+    formats = ('webp',)
+
+    def __init__(self, root=None, base_url=None, workers=None):
+        if Image is None:
+            raise RuntimeError("IMAGE_STORAGE_BACKEND=local needs Pillow to render image variants (pip install Pillow)")
+        self.root = os.path.abspath(root or os.getenv("IMAGE_STORAGE_LOCAL_ROOT", "media"))
+        self.base_url = (base_url or os.getenv("IMAGE_STORAGE_LOCAL_URL", "/media")).rstrip('/')
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or int(os.getenv("IMAGE_VARIANT_WORKERS", 4)),
+            thread_name_prefix="image-variants"
+        )
+
+    @property
+    def route_prefix(self):
+        """URL path this app serves the files under ('' if base_url is another server's root)"""
+        return urlparse(self.base_url).path.rstrip('/')
+
+    @staticmethod
+    def variant_file(path):
+        """
+        Check that a path under the root names a served variant file
+
+        Returns:
+            bool: True for <public_id>/<variant>.<jpg|webp>
+        """
+        public_id, _, filename = path.rpartition('/')
+        variant, _, extension = filename.rpartition('.')
+        return bool(public_id) and variant in VARIANTS and extension in ('jpg', 'webp')
+
+    def _dir(self, public_id):
+        path = os.path.abspath(os.path.join(self.root, public_id))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError("Invalid public_id")
+        return path
+
+    @staticmethod
+    def _render(source, target_dir, variant):
+        """Write <variant>.jpg and <variant>.webp for one variant"""
+        spec = VARIANTS[variant]
+        size = (spec['width'], spec['height'])
+        with Image.open(source) as image:
+            image = image.convert('RGB')
+            if spec['crop'] == 'fill':
+                image = ImageOps.fit(image, size, Image.LANCZOS)
+            else:
+                image.thumbnail(size, Image.LANCZOS)
+            image.save(os.path.join(target_dir, f"{variant}.jpg"), 'JPEG', quality=82, optimize=True, progressive=True)
+            image.save(os.path.join(target_dir, f"{variant}.webp"), 'WEBP', quality=80)
+
+    def put(self, file, folder="gem_lands"):
+        public_id = f"{folder}/{uuid.uuid4().hex}"
+        target_dir = self._dir(public_id)
+        os.makedirs(target_dir, exist_ok=True)
+        source = os.path.join(target_dir, "original")
+        if hasattr(file, 'save'):
+            file.save(source)
+        else:
+            with open(source, 'wb') as out:
+                shutil.copyfileobj(file, out)
+
+        with Image.open(source) as image:
+            width, height = image.size
+            image_format = (image.format or '').lower() or None
+        futures = [self._executor.submit(self._render, source, target_dir, v) for v in VARIANTS]
+        for future in futures:
+            future.result()
+
+        return {
+            'url': self.url_for(public_id, 'full'),
+            'public_id': public_id,
+            'width': width,
+            'height': height,
+            'format': image_format
+        }
+
+    def bulk_delete(self, public_ids):
+        results = {}
+        for public_id in dict.fromkeys(pid for pid in public_ids if pid):
+            try:
+                path = self._dir(public_id)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                    results[public_id] = {'result': 'deleted'}
+                else:
+                    results[public_id] = {'result': 'not_found'}
+            except Exception as e:
+                results[public_id] = {'result': 'error', 'error': str(e)}
+        return results
+
+    def url_for(self, public_id, variant='full', format=None):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown variant: {variant}")
+        # No AVIF encoder locally; browsers asking for it get WebP
+        extension = 'webp' if format in ('webp', 'avif') else 'jpg'
+        return f"{self.base_url}/{public_id}/{variant}.{extension}"
+
+    def list_page(self, folder="gem_lands", cursor=None, limit=500):
+        # Cursor: last public id of the previous page (directories are listed in name order)
+        base = self._dir(folder)
+        names = sorted(os.listdir(base)) if os.path.isdir(base) else []
+        if cursor:
+            names = [name for name in names if f"{folder}/{name}" > cursor]
+        images = []
+        for name in names[:limit]:
+            path = os.path.join(base, name)
+            images.append({
+                'public_id': f"{folder}/{name}",
+                'created_at': datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+            })
+        next_cursor = images[-1]['public_id'] if len(names) > limit else None
+        return images, next_cursor
+
+    def owns_url(self, url):
+        return isinstance(url, str) and url.startswith(self.base_url + '/')
+
+    def public_id_from_url(self, url):
+        # <base_url>/<public_id>/<variant>.<ext>
+        if not self.owns_url(url):
+            return None
+        public_id, _, filename = url[len(self.base_url) + 1:].split('?', 1)[0].rpartition('/')
+        if not public_id or filename.rsplit('.', 1)[0] not in VARIANTS:
+            return None
+        return public_id
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """
+    The configured image storage backend (IMAGE_STORAGE_BACKEND: 'cloudinary' or 'local')
+    """
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            backend = os.getenv("IMAGE_STORAGE_BACKEND", "cloudinary").lower()
+            if backend == 'local':
+                _storage = LocalDiskStorage()
+            elif backend == 'cloudinary':
+                _storage = CloudinaryStorage()
+            else:
+                raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {backend}")
+        return _storage
@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from Models.enquiryModel import Enquiry
+from Models.sellLandModel import SellLandSubmission
+from Utils.imageAssets import ImageAssets
+from Utils.imageGc import ImageGc
+from Utils.imageStorage import get_storage
+from Utils.jobQueue import JobQueue
+from Utils.statsCounters import StatsCounters
+
+
+class JobHandlers:
+    """
+    Background job implementations (registered with JobQueue by register_all)
+
+    Each handler takes the job payload and returns a JSON-serialisable result
+    dict that the job status endpoint exposes; raising makes JobQueue retry.
+    Handlers must be safe to run more than once.
+    """
+
+    @staticmethod
+    def delete_land_images(payload):
+        """
+        Delete the stored images of a deleted land that no other land uses
+        Payload: { land_id, image_urls, released_at? }
+        """
+        image_urls = payload.get('image_urls', [])
+        kept = []
+        if payload.get('released_at'):
+            # Images shared with other lands (same content hash) stay
+            image_urls, kept = ImageAssets.release_unreferenced(
+                image_urls, datetime.fromisoformat(payload['released_at'])
+            )
+        results = get_storage().delete_urls(image_urls)
+        failed = [{"url": url, "error": res.get('error')} for url, res in results.items() if res['result'] == 'error']
+        if failed:
+            # Deleting is idempotent ('not_found' counts as done), so retry the whole set
+            raise Exception(f"{len(failed)} image(s) could not be deleted: {failed[0]['error']}")
+        return {"land_id": payload.get('land_id'), "deleted_images_count": len(results), "kept_images_count": len(kept)}
+
+    @staticmethod
+    def bulk_update_enquiry_status(payload):
+        """
+        Set the status of many enquiries
+        Payload: { enquiry_ids, status }
+        """
+        new_status = payload['status']
+        updated_count = 0
+        failed = []
+
+        for enquiry_id in payload.get('enquiry_ids', []):
+            try:
+                enquiry = Enquiry.objects(id=enquiry_id).first()
+                if enquiry:
+                    enquiry.status = new_status
+                    enquiry.updated_at = datetime.now(timezone.utc)
+
+                    if new_status == 'contacted' and not enquiry.contacted_at:
+                        enquiry.contacted_at = datetime.now(timezone.utc)
+                    elif new_status == 'completed' and not enquiry.completed_at:
+                        enquiry.completed_at = datetime.now(timezone.utc)
+
+                    enquiry.save()
+                    updated_count += 1
+                else:
+                    failed.append({"id": enquiry_id, "reason": "Not found"})
+            except Exception as e:
+                failed.append({"id": enquiry_id, "reason": str(e)})
+
+        return {"updated": updated_count, "failed": len(failed), "failed_details": failed}
+
+    @staticmethod
+    def bulk_approve_submissions(payload):
+        """
+        Approve many sell land submissions
+        Payload: { submission_ids }
+        """
+        approved_count = 0
+        failed = []
+
+        for submission_id in payload.get('submission_ids', []):
+            try:
+                submission = SellLandSubmission.objects(id=submission_id).first()
+                if submission:
+                    submission.status = 'approved'
+                    submission.approved_at = datetime.now(timezone.utc)
+                    submission.updated_at = datetime.now(timezone.utc)
+                    submission.save()
+                    approved_count += 1
+                else:
+                    failed.append({"id": submission_id, "reason": "Not found"})
+            except Exception as e:
+                failed.append({"id": submission_id, "reason": str(e)})
+
+        return {"approved": approved_count, "failed": len(failed), "failed_details": failed}
+
+    @staticmethod
+    def bulk_delete_submissions(payload):
+        """
+        Delete many sell land submissions
+        Payload: { submission_ids }
+        """
+        deleted_count = 0
+        failed = []
+
+        for submission_id in payload.get('submission_ids', []):
+            try:
+                submission = SellLandSubmission.objects(id=submission_id).first()
+                if submission:
+                    submission.delete()
+                    deleted_count += 1
+                else:
+                    failed.append({"id": submission_id, "reason": "Not found"})
+            except Exception as e:
+                failed.append({"id": submission_id, "reason": str(e)})
+
+        return {"deleted": deleted_count, "failed": len(failed), "failed_details": failed}
+
+    @staticmethod
+    def reconcile_stats(payload):
+        """Recount the dashboard counters. Payload: { key? }"""
+        rebuilt = StatsCounters.reconcile(payload.get('key'))
+        return {"reconciled": sorted(rebuilt)}
+
+    @staticmethod
+    def register_all():
+        JobQueue.register('land_images.delete', JobHandlers.delete_land_images, max_attempts=8)
+        JobQueue.register('enquiries.bulk_update_status', JobHandlers.bulk_update_enquiry_status, max_attempts=3)
+        JobQueue.register('submissions.bulk_approve', JobHandlers.bulk_approve_submissions, max_attempts=3)
+        JobQueue.register('submissions.bulk_delete', JobHandlers.bulk_delete_submissions, max_attempts=3)
+        JobQueue.register('stats.reconcile', JobHandlers.reconcile_stats, max_attempts=3)
+        JobQueue.register('images.gc', ImageGc.run, max_attempts=5, with_job=True)
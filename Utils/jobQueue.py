@@ -0,0 +1,225 @@
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from mongoengine.errors import NotUniqueError
+from mongoengine.queryset.visitor import Q
+from Models.jobModel import Job
+
+load_dotenv()
+
+
+class JobQueue:
+    """
+    Small durable job runner backed by the jobs collection
+
+    Controllers enqueue slow side effects (third-party calls, bulk loops) and
+    answer immediately; worker threads in each process claim due jobs with an
+    atomic findAndModify, so a job runs on one worker at a time. A failed
+    attempt is re-queued with exponential backoff and jitter until
+    max_attempts; a worker that dies mid-job loses its lease and the job is
+    claimed again once the lease expires, unless it has used up its attempts,
+    in which case it is marked failed.
+    """
+
+    poll_interval = float(os.getenv("JOB_POLL_SECONDS", 2))
+    lease_seconds = int(os.getenv("JOB_LEASE_SECONDS", 300))
+    backoff_base = float(os.getenv("JOB_BACKOFF_SECONDS", 5))
+    backoff_max = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", 600))
+
+    _handlers = {}  # name -> (handler, max_attempts, with_job)
+    _wakeup = threading.Event()
+    _stop = threading.Event()
+    _threads = []
+
+    @staticmethod
+    def register(name, handler, max_attempts=5, with_job=False):
+        """
+        Register the function that runs jobs called name
+
+        Args:
+            name: Job name
+            handler: Callable(payload) -> dict result; raising marks the attempt failed
+            max_attempts: Attempts before the job is marked failed
+            with_job: Call handler(payload, job) instead, for handlers that
+                      checkpoint with save_progress and resume from job.progress
+        """
+        JobQueue._handlers[name] = (handler, max_attempts, with_job)
+
+    @staticmethod
+    def enqueue(name, payload=None, created_by=None, delay_seconds=0, unique_key=None):
+        """
+        Queue a job for the workers
+
+        Args:
+            unique_key: Held while the job is queued or running; a second active
+                        job with the same key is rejected with NotUniqueError
+
+        Returns:
+            Job: The saved job (its id is what clients poll)
+        """
+        if name not in JobQueue._handlers:
+            raise ValueError(f"Unknown job: {name}")
+        now = datetime.now(timezone.utc)
+        job = Job(
+            name=name,
+            payload=payload or {},
+            max_attempts=JobQueue._handlers[name][1],
+            run_at=now + timedelta(seconds=delay_seconds),
+            created_by=str(created_by) if created_by else None,
+            unique_key=unique_key,
+            created_at=now,
+            updated_at=now
+        )
+        job.save()
+        JobQueue._wakeup.set()
+        return job
+
+    @staticmethod
+    def enqueue_once(name, payload=None):
+        """
+        Queue a job unless one with the same name is already queued or running
+
+        The unique index on Job.unique_key makes this hold across processes:
+        of two concurrent callers, one inserts and the other gets its job.
+
+        Returns:
+            Job: The new job, or the active one that was already queued
+        """
+        for _ in range(3):
+            existing = Job.objects(unique_key=name).first()
+            if existing:
+                return existing
+            try:
+                return JobQueue.enqueue(name, payload, unique_key=name)
+            except NotUniqueError:
+                # Lost the race; the winner's job is returned on the next pass
+                continue
+        raise RuntimeError(f"Could not queue {name}: active job keeps changing")
+
+    @staticmethod
+    def save_progress(job, progress):
+        """Checkpoint a running job (also extends its lease, since the worker is alive)"""
+        now = datetime.now(timezone.utc)
+        job.progress = progress
+        Job.objects(id=job.id, worker=job.worker, status='running').update_one(
+            set__progress=progress,
+            set__locked_until=now + timedelta(seconds=JobQueue.lease_seconds),
+            set__updated_at=now
+        )
+
+    @staticmethod
+    def _backoff(attempts):
+        delay = min(JobQueue.backoff_base * (2 ** max(attempts - 1, 0)), JobQueue.backoff_max)
+        return delay * random.uniform(0.5, 1.5)
+
+    @staticmethod
+    def _fail_exhausted(now):
+        """Mark failed the jobs whose lease expired on their last allowed attempt"""
+        Job.objects(
+            status='running', locked_until__lt=now,
+            __raw__={'$expr': {'$gte': ['$attempts', '$max_attempts']}}
+        ).update(
+            set__status='failed',
+            set__error='Worker lost on the last attempt (lease expired)',
+            set__finished_at=now,
+            set__updated_at=now,
+            unset__unique_key=True
+        )
+
+    @staticmethod
+    def claim(worker_id):
+        """Atomically take the next due job (or one whose lease expired); None if idle"""
+        now = datetime.now(timezone.utc)
+        # A job that keeps killing its worker must not be reclaimed forever
+        JobQueue._fail_exhausted(now)
+        return Job.objects(
+            Q(status='queued', run_at__lte=now) |
+            Q(status='running', locked_until__lt=now, __raw__={'$expr': {'$lt': ['$attempts', '$max_attempts']}})
+        ).order_by('run_at').modify(
+            new=True,
+            set__status='running',
+            set__worker=worker_id,
+            set__locked_until=now + timedelta(seconds=JobQueue.lease_seconds),
+            set__updated_at=now,
+            inc__attempts=1
+        )
+
+    @staticmethod
+    def _finish(job, worker_id, **update):
+        # Only the worker still holding the lease may record the outcome
+        update['set__updated_at'] = datetime.now(timezone.utc)
+        if update.get('set__status') in ('succeeded', 'failed'):
+            update['unset__unique_key'] = True
+        Job.objects(id=job.id, worker=worker_id, status='running').update_one(**update)
+
+    @staticmethod
+    def execute(job, worker_id):
+        """Run one claimed job and record success, retry or failure"""
+        handler, _, with_job = JobQueue._handlers.get(job.name, (None, None, False))
+        if handler is None:
+            JobQueue._finish(job, worker_id, set__status='failed', set__error=f"Unknown job: {job.name}",
+                             set__finished_at=datetime.now(timezone.utc))
+            return
+        try:
+            if with_job:
+                result = handler(job.payload or {}, job) or {}
+            else:
+                result = handler(job.payload or {}) or {}
+        except Exception as e:
+            logging.error(f"Job {job.id} ({job.name}) attempt {job.attempts} failed: {str(e)}")
+            if job.attempts < job.max_attempts:
+                JobQueue._finish(
+                    job, worker_id,
+                    set__status='queued',
+                    set__error=str(e),
+                    set__run_at=datetime.now(timezone.utc) + timedelta(seconds=JobQueue._backoff(job.attempts)),
+                    unset__locked_until=True
+                )
+            else:
+                JobQueue._finish(job, worker_id, set__status='failed', set__error=str(e),
+                                 set__finished_at=datetime.now(timezone.utc))
+            return
+        JobQueue._finish(job, worker_id, set__status='succeeded', set__result=result, unset__error=True,
+                         set__finished_at=datetime.now(timezone.utc))
+
+    @staticmethod
+    def work_once(worker_id):
+        """Claim and run one job; returns False when nothing was due"""
+        job = JobQueue.claim(worker_id)
+        if job is None:
+            return False
+        JobQueue.execute(job, worker_id)
+        return True
+
+    @staticmethod
+    def _run(worker_id):
+        while not JobQueue._stop.is_set():
+            try:
+                if JobQueue.work_once(worker_id):
+                    continue
+            except Exception as e:
+                logging.error(f"Job worker {worker_id} error: {str(e)}")
+            JobQueue._wakeup.wait(JobQueue.poll_interval)
+            JobQueue._wakeup.clear()
+
+    @staticmethod
+    def start(workers):
+        """Start worker threads in this process (0 disables; idempotent)"""
+        if workers <= 0 or JobQueue._threads:
+            return
+        prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        for i in range(workers):
+            thread = threading.Thread(target=JobQueue._run, args=(f"{prefix}:{i}",),
+                                      name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            JobQueue._threads.append(thread)
+
+    @staticmethod
+    def stop():
+        JobQueue._stop.set()
+        JobQueue._wakeup.set()
@@ -0,0 +1,145 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from flask import Response
+from mongoengine import signals
+from Models.landModels import Land
+from Models.siteContentModels import LandingContent
+from Utils.httpCache import HttpCache, CollectionVersions
+
+load_dotenv()
+
+
+class LandingCache:
+    """
+    In-process cache of the encoded public landing payload
+
+    The resolved landing JSON is kept as ready-to-send bytes (plain and
+    gzip), keyed by its ETag, so a homepage hit costs one version-stamp read
+    and a memory copy. The ETag is built from the 'landing' and
+    'landing_lands' collection versions; the latter is bumped (by the Land
+    signals below) only when a land that can appear on the page changes: one
+    referenced by urgent_sales or flagged is_urgent before or after the
+    write. Any process seeing a new stamp rebuilds, so all workers stay
+    consistent; CACHE_SECONDS bounds the lifetime of an entry regardless.
+    """
+
+    CACHE_SECONDS = int(os.getenv("LANDING_CACHE_SECONDS", 300))
+    # Bodies smaller than this are not worth compressing
+    GZIP_MIN_BYTES = 1024
+
+    _entry = None
+    _build_lock = threading.Lock()
+    _SNAPSHOT_ATTR = '_landing_urgent'
+    _connected = False
+
+    @staticmethod
+    def stamps():
+        return CollectionVersions.stamps('landing', 'landing_lands')
+
+    @staticmethod
+    def version(stamps):
+        """
+        Args:
+            stamps: LandingCache.stamps()
+
+        Returns:
+            tuple: (etag, last_modified) of the landing payload at these stamps
+        """
+        etag = HttpCache.etag(
+            'landing', HttpCache.stamp(stamps.get('landing')), HttpCache.stamp(stamps.get('landing_lands'))
+        )
+        return etag, HttpCache.latest(*(doc.get('updated_at') for doc in stamps.values()))
+
+    @staticmethod
+    def get(etag, last_modified, build):
+        """
+        Cached entry for etag, building it with build() -> payload dict on a miss
+
+        Returns:
+            dict: { etag, last_modified, body, gzip_body, expires }
+        """
+        entry = LandingCache._entry
+        if entry and entry['etag'] == etag and entry['expires'] > time.monotonic():
+            return entry
+        with LandingCache._build_lock:
+            entry = LandingCache._entry
+            if entry and entry['etag'] == etag and entry['expires'] > time.monotonic():
+                return entry
+            return LandingCache.put(etag, last_modified, build())
+
+    @staticmethod
+    def put(etag, last_modified, payload):
+        body = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+            'gzip_body': gzip.compress(body, 6) if len(body) >= LandingCache.GZIP_MIN_BYTES else None,
+            'expires': time.monotonic() + LandingCache.CACHE_SECONDS,
+        }
+        LandingCache._entry = entry
+        return entry
+
+    @staticmethod
+    def invalidate():
+        LandingCache._entry = None
+
+    @staticmethod
+    def response(entry, use_gzip, cache_control):
+        """200 response with the cached bytes (gzip'd when the client accepts it)"""
+        gzipped = use_gzip and entry['gzip_body'] is not None
+        response = Response(entry['gzip_body'] if gzipped else entry['body'], 200, mimetype='application/json')
+        response.headers.update(HttpCache.headers(LandingCache.representation_etag(entry['etag'], gzipped),
+                                                  entry['last_modified'], cache_control))
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    @staticmethod
+    def representation_etag(etag, gzipped):
+        # Strong ETags must differ between encodings of the same payload
+        return etag[:-1] + '-gz"' if gzipped else etag
+
+    # Write-time invalidation
+
+    @staticmethod
+    def _referenced_land_ids():
+        doc = LandingContent._get_collection().find_one({}, {'urgent_sales.land_id': 1}) or {}
+        return {str(item.get('land_id')) for item in doc.get('urgent_sales') or [] if item.get('land_id')}
+
+    @staticmethod
+    def _on_init(sender, document, **kwargs):
+        if document.pk is not None:
+            setattr(document, LandingCache._SNAPSHOT_ATTR, bool(document._data.get('is_urgent')))
+
+    @staticmethod
+    def _on_write(sender, document, **kwargs):
+        try:
+            was_urgent = getattr(document, LandingCache._SNAPSHOT_ATTR, False)
+            is_urgent = bool(document._data.get('is_urgent')) and not kwargs.get('deleted')
+            setattr(document, LandingCache._SNAPSHOT_ATTR, is_urgent)
+            if was_urgent or is_urgent or str(document.pk) in LandingCache._referenced_land_ids():
+                CollectionVersions.bump('landing_lands')
+                LandingCache.invalidate()
+        except Exception as e:
+            logging.error(f"Failed to invalidate landing cache: {str(e)}")
+
+    @staticmethod
+    def _on_delete(sender, document, **kwargs):
+        LandingCache._on_write(sender, document, deleted=True)
+
+    @staticmethod
+    def connect():
+        """Register the Land signal handlers (idempotent)"""
+        if LandingCache._connected:
+            return
+        signals.post_init.connect(LandingCache._on_init, sender=Land, weak=False)
+        signals.post_save.connect(LandingCache._on_write, sender=Land, weak=False)
+        signals.post_delete.connect(LandingCache._on_delete, sender=Land, weak=False)
+        LandingCache._connected = True
@@ -0,0 +1,117 @@
+class GroupedListing:
+    """
+    Single-pass listing engine for the "grouped + flat" list endpoints
+
+    Each document is read from the cursor once and serialized once; the same
+    dict is placed in its status group and in the flat list, and the total is
+    taken from the pass instead of a separate count() query.
+    """
+
+    VIEWS = ('both', 'grouped', 'flat')
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def parse_params(args):
+        """
+        Read listing options from request query params
+
+        Query params: view? (both|grouped|flat), page?, page_size?, include_total?
+
+        Returns:
+            dict: Keyword arguments for GroupedListing.build
+
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        view = (args.get('view') or 'both').lower()
+        if view not in GroupedListing.VIEWS:
+            raise ValueError(f"view must be one of: {', '.join(GroupedListing.VIEWS)}")
+
+        page_size = args.get('page_size') or args.get('limit')
+        page = args.get('page')
+        if page_size:
+            page_size = GroupedListing._positive_int(page_size)
+            if page_size is None:
+                name = 'page_size' if args.get('page_size') else 'limit'
+                raise ValueError(f"{name} must be an integer between 1 and {GroupedListing.MAX_PAGE_SIZE}")
+            page_size = min(page_size, GroupedListing.MAX_PAGE_SIZE)
+            page = GroupedListing._positive_int(page or 1)
+            if page is None:
+                raise ValueError("page must be a positive integer")
+        else:
+            page_size = None
+            page = None
+
+        return {
+            "view": view,
+            "page": page,
+            "page_size": page_size,
+            "include_total": (args.get('include_total') or '').lower() in ['true', '1', 'yes']
+        }
+
+    @staticmethod
+    def _positive_int(value):
+        """Parse a query param as an integer >= 1, or None if it is not one"""
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return None
+        return number if number >= 1 else None
+
+    @staticmethod
+    def build(queryset, groups, list_key, group_by='status', serializer=None,
+              view='both', page=None, page_size=None, include_total=False):
+        """
+        Build the listing payload in one cursor pass
+
+        Args:
+            queryset: Filtered and ordered mongoengine queryset
+            groups: Group names to always include (in display order)
+            list_key: Key of the flat list in the payload (e.g. "lands")
+            group_by: Document attribute used for grouping (default: "status")
+            serializer: Callable turning a list of documents into a list of dicts
+                        (default: each document's to_json())
+            view: "both", "grouped" or "flat"
+            page, page_size: Optional offset pagination (1-based page)
+            include_total: Count all matches when the page does not reveal the total
+
+        Returns:
+            dict: { total?, grouped?, <list_key>?, page?, page_size?, has_more? }
+        """
+        has_more = False
+        if page_size:
+            queryset = queryset.skip((page - 1) * page_size).limit(page_size + 1)
+
+        docs = list(queryset)
+        if page_size and len(docs) > page_size:
+            docs = docs[:page_size]
+            has_more = True
+
+        if serializer is None:
+            items = [doc.to_json() for doc in docs]
+        else:
+            items = serializer(docs)
+
+        data = {}
+        if not page_size:
+            data["total"] = len(items)
+        elif not has_more and (items or page == 1):
+            data["total"] = (page - 1) * page_size + len(items)
+        elif include_total:
+            data["total"] = queryset.count(with_limit_and_skip=False)
+
+        if view in ('both', 'grouped'):
+            grouped = {name: [] for name in groups}
+            for doc, item in zip(docs, items):
+                grouped.setdefault(getattr(doc, group_by), []).append(item)
+            data["grouped"] = grouped
+
+        if view in ('both', 'flat'):
+            data[list_key] = items
+
+        if page_size:
+            data["page"] = page
+            data["page_size"] = page_size
+            data["has_more"] = has_more
+
+        return data
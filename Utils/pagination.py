@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from mongoengine.queryset.visitor import Q
+
+
+class CursorPagination:
+    """
+    Keyset (cursor) pagination over (created_at, _id), newest first
+
+    The cursor is an opaque url-safe token encoding the sort key of the last
+    item of the previous page, so every page costs the same index range scan
+    no matter how deep the client has paged.
+    """
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+        """
+        Parse a `limit` query parameter
+
+        Raises:
+            ValueError: If the value is not a positive integer
+        """
+        if value in (None, ''):
+            return default
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            limit = 0
+        if limit < 1:
+            raise ValueError(f"limit must be an integer between 1 and {maximum}")
+        return min(limit, maximum)
+
+    @staticmethod
+    def encode_cursor(created_at, doc_id):
+        raw = json.dumps({
+            "c": created_at.isoformat() if created_at else None,
+            "i": str(doc_id)
+        }, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor produced by encode_cursor
+
+        Returns:
+            tuple: (created_at, ObjectId)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            created_at = datetime.fromisoformat(data['c']) if data.get('c') else None
+            return created_at, ObjectId(data['i'])
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def paginate(queryset, cursor=None, limit=DEFAULT_LIMIT):
+        """
+        Fetch one page of a queryset ordered by (-created_at, -_id)
+
+        Args:
+            queryset: Filtered mongoengine queryset
+            cursor: Opaque cursor returned by the previous page (optional)
+            limit: Page size
+
+        Returns:
+            tuple: (list of documents, next_cursor or None)
+        """
+        if cursor:
+            created_at, last_id = CursorPagination.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+            )
+
+        # Fetch one extra document to know whether another page exists
+        docs = list(queryset.order_by('-created_at', '-id').limit(limit + 1))
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = CursorPagination.encode_cursor(last.created_at, last.id)
+        return docs, next_cursor
+
+    @staticmethod
+    def paginate_ranked(queryset, cursor=None, limit=DEFAULT_LIMIT):
+        """
+        Fetch one page of a queryset that is already in relevance order
+
+        Relevance scores are not a stable keyset, so ranked results (text
+        search) page by position; the cursor stays opaque to clients.
+
+        Returns:
+            tuple: (list of documents, next_cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        offset = 0
+        if cursor:
+            try:
+                padded = cursor + '=' * (-len(cursor) % 4)
+                offset = int(json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['o'])
+            except Exception:
+                raise ValueError("Invalid cursor")
+            if offset < 0:
+                raise ValueError("Invalid cursor")
+
+        docs = list(queryset.skip(offset).limit(limit + 1))
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            raw = json.dumps({"o": offset + limit}, separators=(',', ':')).encode('utf-8')
+            next_cursor = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+        return docs, next_cursor
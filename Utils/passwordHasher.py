@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+load_dotenv()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a call timed out; callers answer 503"""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Server is busy, please retry shortly")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Password hashing and verification off the request thread
+
+    pbkdf2 is CPU-bound for tens of milliseconds per call, so hash/verify run
+    in a small process pool. At most PASSWORD_HASH_QUEUE_LIMIT calls may be in
+    flight per worker process; beyond that callers get PasswordHasherBusy
+    immediately instead of queueing behind a login burst. A call that does not
+    finish within PASSWORD_HASH_TIMEOUT_SECONDS is abandoned the same way.
+    """
+
+    # Target hashing method; stored hashes made with other parameters are upgraded on login
+    METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+    workers = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    queue_limit = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 32))
+    timeout = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+
+    _pool = None
+    _pool_lock = threading.Lock()
+    _slots = threading.BoundedSemaphore(queue_limit)
+
+    @staticmethod
+    def _get_pool():
+        with PasswordHasher._pool_lock:
+            if PasswordHasher._pool is None:
+                PasswordHasher._pool = ProcessPoolExecutor(max_workers=PasswordHasher.workers)
+            return PasswordHasher._pool
+
+    @staticmethod
+    def _reset_pool(pool):
+        with PasswordHasher._pool_lock:
+            if PasswordHasher._pool is pool:
+                PasswordHasher._pool = None
+        pool.shutdown(wait=False)
+
+    @staticmethod
+    def _run(fn, *args):
+        """Run fn in the pool under admission control (inline if the pool is broken)"""
+        if PasswordHasher.workers <= 0:
+            return fn(*args)
+        if not PasswordHasher._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            pool = PasswordHasher._get_pool()
+            try:
+                future = pool.submit(fn, *args)
+                return future.result(timeout=PasswordHasher.timeout)
+            except FutureTimeoutError:
+                # Drops the call if it is still queued; a running one finishes unobserved
+                future.cancel()
+                raise PasswordHasherBusy(retry_after=max(int(PasswordHasher.timeout), 1))
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool next time and answer this call inline
+                PasswordHasher._reset_pool(pool)
+                return fn(*args)
+        finally:
+            PasswordHasher._slots.release()
+
+    @staticmethod
+    def hash(password):
+        """
+        Hash a password with the configured method
+
+        Raises:
+            PasswordHasherBusy: If too many hash/verify calls are in flight or the call timed out
+        """
+        return PasswordHasher._run(generate_password_hash, password, PasswordHasher.METHOD)
+
+    @staticmethod
+    def verify(hashed, password):
+        """
+        Check a password against a stored hash
+
+        Raises:
+            PasswordHasherBusy: If too many hash/verify calls are in flight or the call timed out
+        """
+        if not hashed or not password:
+            return False
+        return PasswordHasher._run(check_password_hash, hashed, password)
+
+    @staticmethod
+    def needs_rehash(hashed):
+        """True if a stored hash was made with a different method or cost than METHOD"""
+        method = (hashed or '').split('$', 1)[0]
+        target = PasswordHasher.METHOD
+        if target.startswith('pbkdf2:') and target.count(':') == 1:
+            # werkzeug fills in its default iteration count
+            target = f"{target}:{DEFAULT_PBKDF2_ITERATIONS}"
+        return method != target
+
+
+class LoginThrottle:
+    """
+    Per-identifier sliding window of failed password attempts (per worker process)
+
+    After PASSWORD_ATTEMPT_LIMIT failures within PASSWORD_ATTEMPT_WINDOW_SECONDS
+    further attempts for that identifier are refused until the oldest failure
+    leaves the window, so guessing bursts never reach the hashing pool.
+    """
+
+    limit = int(os.getenv("PASSWORD_ATTEMPT_LIMIT", 10))
+    window = float(os.getenv("PASSWORD_ATTEMPT_WINDOW_SECONDS", 300))
+    max_keys = 10000
+
+    _failures = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _key(identifier):
+        return (identifier or '').strip().lower()
+
+    @staticmethod
+    def retry_after(identifier):
+        """Seconds until identifier may try again (0 = allowed now)"""
+        if LoginThrottle.limit <= 0:
+            return 0
+        now = time.time()
+        with LoginThrottle._lock:
+            failures = LoginThrottle._failures.get(LoginThrottle._key(identifier))
+            if not failures:
+                return 0
+            while failures and failures[0] <= now - LoginThrottle.window:
+                failures.popleft()
+            if len(failures) < LoginThrottle.limit:
+                return 0
+            return max(int(failures[0] + LoginThrottle.window - now) + 1, 1)
+
+    @staticmethod
+    def record_failure(identifier):
+        key = LoginThrottle._key(identifier)
+        with LoginThrottle._lock:
+            failures = LoginThrottle._failures.pop(key, None) or deque(maxlen=max(LoginThrottle.limit, 1))
+            failures.append(time.time())
+            LoginThrottle._failures[key] = failures
+            while len(LoginThrottle._failures) > LoginThrottle.max_keys:
+                LoginThrottle._failures.popitem(last=False)
+
+    @staticmethod
+    def reset(identifier):
+        with LoginThrottle._lock:
+            LoginThrottle._failures.pop(LoginThrottle._key(identifier), None)
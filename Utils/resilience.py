@@ -0,0 +1,261 @@
+import random
+import threading
+import time
+from collections import deque
+
+
+class DependencyUnavailable(Exception):
+    """Raised when an external dependency cannot be called right now; callers answer 503"""
+
+    def __init__(self, dependency, message, retry_after=1):
+        super().__init__(f"{dependency} is unavailable: {message}")
+        self.dependency = dependency
+        self.retry_after = max(int(retry_after), 1)
+
+
+class CircuitOpenError(DependencyUnavailable):
+    """The dependency's circuit breaker is open: the call was not attempted"""
+
+
+class DeadlineExceeded(DependencyUnavailable):
+    """The call (including retries) did not finish within its deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed: calls go through; failure_threshold failures in a row open it.
+    open: calls fail fast with CircuitOpenError for reset_timeout seconds.
+    half_open: one trial call is let through; success closes the breaker,
+    failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _retry_after(self):
+        return self.reset_timeout - (time.monotonic() - self.opened_at)
+
+    def allow(self):
+        """
+        Raises:
+            CircuitOpenError: If the call must not be attempted
+        """
+        with self._lock:
+            if self.state == 'open' and self._retry_after() <= 0:
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_after = self._retry_after() if self.state == 'open' else 1
+        raise CircuitOpenError(self.name, "circuit open after repeated failures", retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self):
+        """End a half-open trial whose outcome says nothing about the dependency"""
+        with self._lock:
+            self._trial_running = False
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected
+            }
+
+
+class LatencyStats:
+    """Call counters plus latency percentiles over the most recent calls"""
+
+    def __init__(self, window=500):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.saturated = 0  # calls turned away for lack of a free slot
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self._latencies.append(seconds)
+
+    def count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            calls, failures, retries, timeouts = self.calls, self.failures, self.retries, self.timeouts
+            saturated = self.saturated
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 1)
+
+        return {
+            "calls": calls,
+            "failures": failures,
+            "retries": retries,
+            "timeouts": timeouts,
+            "saturated": saturated,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99),
+                           "max": percentile(1.0)}
+        }
+
+
+class Dependency:
+    """
+    Guarded access to one external service
+
+    Every call gets a monotonic deadline covering all its attempts, goes
+    through the circuit breaker, and holds one of max_concurrent slots (waiting
+    at most queue_timeout for one, so a slow provider cannot pin request threads).
+    Each attempt's socket timeout is min(attempt_timeout, time left), and no
+    attempt or retry starts once the deadline has passed, so retries can never
+    stretch a call past it. (The socket timeout bounds each read, so a
+    provider trickling bytes can still overrun within its last attempt.)
+    Idempotent calls are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, name, timeout=20, retries=2, backoff_base=0.5, failure_threshold=5,
+                 reset_timeout=30, max_concurrent=8, is_failure=None, attempt_timeout=None,
+                 queue_timeout=0.5):
+        """
+        Args:
+            name: Name used in errors and metrics
+            timeout: Default deadline in seconds of one call, retries included
+            retries: Extra attempts for idempotent calls
+            backoff_base: First retry delay in seconds (doubled per attempt, +/-50% jitter)
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+            max_concurrent: Calls allowed in flight at once in this process
+            is_failure: Callable(exception) -> bool telling provider failures
+                        (retried, counted by the breaker) from rejected requests
+            attempt_timeout: Socket timeout of one attempt of an idempotent call
+                             (default: timeout shared evenly by all attempts)
+            queue_timeout: Seconds a call may wait for a free slot before failing fast
+        """
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.attempt_timeout = attempt_timeout or timeout / (retries + 1)
+        self.backoff_base = backoff_base
+        self.is_failure = is_failure or (lambda e: True)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.stats = LatencyStats()
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        Resilience.register(self)
+
+    def call(self, fn, idempotent=False, timeout=None):
+        """
+        Run fn(timeout=<seconds for this attempt>) under the deadline, breaker and concurrency limit
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            DeadlineExceeded: If no successful attempt fitted in the deadline
+            DependencyUnavailable: If no slot freed up within queue_timeout, or the
+                                   last attempt failed on the provider's side
+            Exception: Whatever fn raised if the provider rejected the request
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        if not self._slots.acquire(timeout=min(self.queue_timeout, timeout or self.timeout)):
+            self.stats.count('saturated')
+            raise DependencyUnavailable(self.name, "too many calls in flight")
+        try:
+            attempt = 0
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.count('timeouts')
+                    raise DeadlineExceeded(self.name, f"deadline passed after {attempt} attempt(s)", self.timeout)
+                # A single-shot call may use all the time left; retried calls leave room for retries
+                per_try = min(self.attempt_timeout, remaining) if idempotent else remaining
+                self.breaker.allow()
+                started = time.monotonic()
+                settled = False
+                try:
+                    result = fn(timeout=per_try)
+                except Exception as e:
+                    failure = self.is_failure(e)
+                    self.stats.record(time.monotonic() - started, ok=not failure)
+                    if not failure:
+                        raise
+                    self.breaker.record_failure()
+                    settled = True
+                    attempt += 1
+                    delay = self.backoff_base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                    if not idempotent or attempt > self.retries:
+                        raise DependencyUnavailable(self.name, str(e)) from e
+                    if time.monotonic() + delay >= deadline:
+                        self.stats.count('timeouts')
+                        raise DeadlineExceeded(self.name, f"gave up after {attempt} attempt(s): {str(e)}") from e
+                    self.stats.count('retries')
+                    time.sleep(delay)
+                    continue
+                else:
+                    self.stats.record(time.monotonic() - started, ok=True)
+                    self.breaker.record_success()
+                    settled = True
+                    return result
+                finally:
+                    # Whatever ended the attempt (even a BaseException), never leave a
+                    # half-open trial marked as running
+                    if not settled:
+                        self.breaker.release()
+        finally:
+            self._slots.release()
+
+    def metrics(self):
+        return dict(self.stats.metrics(), circuit=self.breaker.metrics(), max_concurrent=self.max_concurrent)
+
+
+class Resilience:
+    """Registry of guarded dependencies (for the metrics endpoint)"""
+
+    _dependencies = {}
+
+    @staticmethod
+    def register(dependency):
+        Resilience._dependencies[dependency.name] = dependency
+
+    @staticmethod
+    def metrics():
+        return {name: dep.metrics() for name, dep in Resilience._dependencies.items()}
@@ -0,0 +1,243 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from mongoengine import signals
+from pymongo.errors import DuplicateKeyError
+from Models.adminModels import Admin_And_User
+from Models.enquiryModel import Enquiry
+from Models.landModels import Land
+from Models.sellLandModel import SellLandSubmission
+from Models.statsCounterModel import StatsCounter
+from Utils.jobQueue import JobQueue
+
+
+class StatsCounters:
+    """
+    Write-maintained counters behind the dashboards (stats_counters collection)
+
+    Document signals keep one counter document per collection up to date: every
+    create, delete and change of a tracked field ($inc) adjusts the matching
+    buckets. Writes that bypass document signals (queryset.update(), reverse
+    delete rules) can cause drift, which reconcile() repairs by recounting with
+    an aggregation. Only low-cardinality fields are tracked, so a counter
+    document stays small.
+    """
+
+    # model -> (counter key, tracked dimensions)
+    TRACKED = {
+        Land: ('lands', ('status',)),
+        Enquiry: ('enquiries', ('status', 'enquiry_type', 'is_followed_up')),
+        SellLandSubmission: ('sell_land_submissions', ('status', 'land_type')),
+        Admin_And_User: ('users', ('role',)),
+    }
+
+    _SNAPSHOT_ATTR = '_stats_snapshot'
+    _connected = False
+    _reconciler = None
+
+    @staticmethod
+    def _bucket(doc, field):
+        """Counter bucket name of one field of a document (None = not counted)"""
+        value = doc._data.get(field)
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value) if value is not None else None
+
+    @staticmethod
+    def _snapshot(doc, fields):
+        return {field: StatsCounters._bucket(doc, field) for field in fields}
+
+    @staticmethod
+    def _increment(key, inc):
+        """Apply $inc deltas to an existing counter document (never creates one)"""
+        inc = {path: delta for path, delta in inc.items() if delta}
+        if not inc:
+            return
+        # Every change bumps the version, so reconcile() can detect writes it raced with
+        inc['version'] = 1
+        StatsCounter._get_collection().update_one(
+            {'key': key},
+            {'$inc': inc, '$set': {'updated_at': datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def _deltas(snapshot, sign):
+        inc = {}
+        for field, bucket in snapshot.items():
+            if bucket is not None:
+                path = f"counts.{field}.{bucket}"
+                inc[path] = inc.get(path, 0) + sign
+        return inc
+
+    # Signal handlers
+
+    @staticmethod
+    def _on_init(sender, document, **kwargs):
+        tracked = StatsCounters.TRACKED.get(sender)
+        if tracked and document.pk is not None:
+            setattr(document, StatsCounters._SNAPSHOT_ATTR, StatsCounters._snapshot(document, tracked[1]))
+
+    @staticmethod
+    def _on_save(sender, document, created=False, **kwargs):
+        tracked = StatsCounters.TRACKED.get(sender)
+        if not tracked:
+            return
+        key, fields = tracked
+        try:
+            current = StatsCounters._snapshot(document, fields)
+            previous = getattr(document, StatsCounters._SNAPSHOT_ATTR, None)
+            if created or previous is None:
+                inc = StatsCounters._deltas(current, 1)
+                inc['counts.total'] = 1
+            else:
+                changed = {f: previous[f] for f in fields if previous.get(f) != current[f]}
+                inc = StatsCounters._deltas(changed, -1)
+                for path, delta in StatsCounters._deltas({f: current[f] for f in changed}, 1).items():
+                    inc[path] = inc.get(path, 0) + delta
+            StatsCounters._increment(key, inc)
+            setattr(document, StatsCounters._SNAPSHOT_ATTR, current)
+        except Exception as e:
+            logging.error(f"Failed to update stats counters for {key}: {str(e)}")
+
+    @staticmethod
+    def _on_delete(sender, document, **kwargs):
+        tracked = StatsCounters.TRACKED.get(sender)
+        if not tracked:
+            return
+        key, fields = tracked
+        try:
+            snapshot = getattr(document, StatsCounters._SNAPSHOT_ATTR, None) or StatsCounters._snapshot(document, fields)
+            inc = StatsCounters._deltas(snapshot, -1)
+            inc['counts.total'] = -1
+            StatsCounters._increment(key, inc)
+        except Exception as e:
+            logging.error(f"Failed to update stats counters for {key}: {str(e)}")
+
+    @staticmethod
+    def connect():
+        """Register the document signal handlers (idempotent)"""
+        if StatsCounters._connected:
+            return
+        for model in StatsCounters.TRACKED:
+            signals.post_init.connect(StatsCounters._on_init, sender=model, weak=False)
+            signals.post_save.connect(StatsCounters._on_save, sender=model, weak=False)
+            signals.post_delete.connect(StatsCounters._on_delete, sender=model, weak=False)
+        StatsCounters._connected = True
+
+    # Reading and reconciliation
+
+    @staticmethod
+    def get(key):
+        """
+        Return the counts of one collection, building the counter document on first use
+
+        Returns:
+            dict: { "total": n, "<dimension>": { "<value>": n } }
+        """
+        doc = StatsCounter.objects(key=key).only('counts').first()
+        if doc is None:
+            return StatsCounters.reconcile(key)[key]
+        return doc.counts or {}
+
+    @staticmethod
+    def _count(model, fields):
+        """Recount one collection with a single $facet aggregation"""
+        facets = {"total": [{"$count": "n"}]}
+        for field in fields:
+            facets[field] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        result = next(iter(model.objects.aggregate([{"$facet": facets}])), {})
+
+        counts = {"total": result["total"][0]["n"] if result.get("total") else 0}
+        for field in fields:
+            buckets = {}
+            for row in result.get(field, []):
+                value = row['_id']
+                if value is None:
+                    continue
+                if isinstance(value, bool):
+                    value = 'true' if value else 'false'
+                buckets[str(value)] = row['count']
+            counts[field] = buckets
+        return counts
+
+    # Attempts of one counter's reconciliation before it is left to the next run
+    RECONCILE_ATTEMPTS = 3
+
+    @staticmethod
+    def _replace(counter_key, model, fields):
+        """
+        Recount one collection and store the result, unless a signal $inc landed meanwhile
+
+        The stored version is read before recounting and the write only matches
+        that version, so increments applied during the aggregation are never
+        overwritten: the recount is retried instead.
+
+        Returns:
+            dict: The stored counts, or None if every attempt raced with a write
+        """
+        collection = StatsCounter._get_collection()
+        for _ in range(StatsCounters.RECONCILE_ATTEMPTS):
+            stored = collection.find_one({'key': counter_key}, {'version': 1})
+            version = stored.get('version') if stored else None
+            counts = StatsCounters._count(model, fields)
+            now = datetime.now(timezone.utc)
+            try:
+                result = collection.update_one(
+                    {'key': counter_key, 'version': version},
+                    {'$set': {
+                        'counts': counts, 'version': (version or 0) + 1, 'updated_at': now, 'reconciled_at': now
+                    }},
+                    upsert=stored is None
+                )
+            except DuplicateKeyError:
+                # Another process created the counter document first
+                continue
+            if result.matched_count or result.upserted_id is not None:
+                return counts
+        logging.warning(f"Stats counters of {counter_key} kept changing during reconciliation; will retry next run")
+        return None
+
+    @staticmethod
+    def reconcile(key=None):
+        """
+        Recompute counters from the source collections and replace the stored ones
+
+        Args:
+            key: Counter key to rebuild (default: all)
+
+        Returns:
+            dict: {key: counts} of the rebuilt counters
+        """
+        rebuilt = {}
+        for model, (counter_key, fields) in StatsCounters.TRACKED.items():
+            if key and counter_key != key:
+                continue
+            counts = StatsCounters._replace(counter_key, model, fields)
+            if counts is None:
+                # Still correct to serve: the stored counters only lack this run's repairs
+                counts = StatsCounter.objects(key=counter_key).only('counts').first().counts or {}
+            rebuilt[counter_key] = counts
+        return rebuilt
+
+    @staticmethod
+    def start_reconciler(interval_seconds):
+        """
+        Queue a 'stats.reconcile' job every interval_seconds from a daemon thread (0 disables)
+
+        The job queue runs at most one reconciliation at a time across all processes.
+        """
+        if interval_seconds <= 0 or StatsCounters._reconciler is not None:
+            return
+
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval_seconds):
+                try:
+                    JobQueue.enqueue_once('stats.reconcile')
+                except Exception as e:
+                    logging.error(f"Failed to queue stats counter reconciliation: {str(e)}")
+
+        thread = threading.Thread(target=run, name='stats-reconciler', daemon=True)
+        thread.start()
+        StatsCounters._reconciler = stop
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class TokenCache:
+    """
+    Bounded in-process LRU cache of verified JWTs
+
+    Entries are keyed by the SHA-256 of the raw token (the token itself is never stored)
+    and hold the decoded claims, with the token version they were verified against, until
+    the token's `exp`, capped by TOKEN_CACHE_TTL_SECONDS so logins handled by other worker
+    processes are picked up within that window.
+    """
+
+    _entries = OrderedDict()  # token hash -> (expires_at, claims, token_version)
+    _by_user = {}  # user_id -> set of token hashes
+    _lock = threading.Lock()
+
+    max_size = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+    max_ttl = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def get(cls, token):
+        """
+        Return the cached verification of a token, or None if missing/expired
+
+        Args:
+            token: Raw JWT string
+
+        Returns:
+            tuple: (claims, token_version) of a previously verified token, or None
+        """
+        key = cls._key(token)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if not entry:
+                return None
+            expires_at, claims, version = entry
+            if expires_at <= time.time():
+                cls._remove(key, claims.get('user_id'))
+                return None
+            cls._entries.move_to_end(key)
+            return claims, version
+
+    @classmethod
+    def put(cls, token, claims, version):
+        """
+        Store the claims of a token that has just been fully verified
+
+        Args:
+            token: Raw JWT string
+            claims: Decoded JWT payload (must contain user_id, may contain exp)
+            version: The user's token version the token was accepted under
+        """
+        if cls.max_size <= 0:
+            return
+        expires_at = time.time() + cls.max_ttl
+        exp = claims.get('exp')
+        if exp:
+            expires_at = min(expires_at, float(exp))
+        user_id = claims.get('user_id')
+        key = cls._key(token)
+        with cls._lock:
+            cls._entries[key] = (expires_at, claims, version)
+            cls._entries.move_to_end(key)
+            cls._by_user.setdefault(user_id, set()).add(key)
+            while len(cls._entries) > cls.max_size:
+                old_key, (_, old_claims, _) = cls._entries.popitem(last=False)
+                cls._unlink(old_key, old_claims.get('user_id'))
+
+    @classmethod
+    def invalidate(cls, token):
+        """Drop the cached verification of one token"""
+        key = cls._key(token)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry:
+                cls._remove(key, entry[1].get('user_id'))
+
+    @classmethod
+    def invalidate_user(cls, user_id):
+        """Drop every cached token belonging to a user (login, password change, deletion)"""
+        user_id = str(user_id)
+        with cls._lock:
+            for key in cls._by_user.pop(user_id, set()):
+                cls._entries.pop(key, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._by_user.clear()
+
+    @classmethod
+    def _remove(cls, key, user_id):
+        cls._entries.pop(key, None)
+        cls._unlink(key, user_id)
+
+    @classmethod
+    def _unlink(cls, key, user_id):
+        keys = cls._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                cls._by_user.pop(user_id, None)
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from Models.adminModels import Admin_And_User
+from Models.collectionVersionModel import CollectionVersion
+
+load_dotenv()
+
+
+class TokenVersions:
+    """
+    In-process map of user id -> current token version (the JWT `tv` claim)
+
+    A token is valid while its `tv` equals the user's token_version; bumping the
+    version (logout, password change) revokes every token issued before it.
+    Users are loaded on first sight (at most TOKEN_VERSION_MAX_SIZE, least recently
+    used evicted first), then kept fresh by a poller thread that reads documents
+    whose updated_at moved every TOKEN_VERSION_POLL_SECONDS and re-reads all known
+    users every TOKEN_VERSION_FULL_REFRESH_SECONDS. A user deletion bumps a shared
+    counter, so every process re-reads its known users (dropping the deleted one)
+    at its next poll. With the poller running, verifying a known user reads only
+    memory; without it, current() polls inline.
+    """
+
+    poll_interval = float(os.getenv("TOKEN_VERSION_POLL_SECONDS", 5))
+    full_refresh_interval = float(os.getenv("TOKEN_VERSION_FULL_REFRESH_SECONDS", 600))
+    max_size = int(os.getenv("TOKEN_VERSION_MAX_SIZE", 10000))
+
+    # Re-read this much before the cursor to tolerate writers with slightly skewed clocks
+    OVERLAP = timedelta(seconds=2)
+
+    # collection_versions counter bumped by every user deletion
+    DELETIONS_KEY = 'user_deletions'
+
+    _versions = OrderedDict()  # user_id -> token_version, least recently used first
+    _deletions = None  # deletion counter seen by the last poll
+    _cursor = None  # newest updated_at seen by a poll
+    _last_poll = 0.0
+    _last_full = 0.0
+    _lock = threading.Lock()
+    _poller = None  # stop event of the poller thread
+
+    @staticmethod
+    def start_poller():
+        """Poll for token version changes every poll_interval from a daemon thread"""
+        if TokenVersions._poller is not None:
+            return
+
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(TokenVersions.poll_interval):
+                try:
+                    TokenVersions._poll()
+                except Exception as e:
+                    logging.error(f"Failed to poll token versions: {str(e)}")
+
+        TokenVersions._poller = stop
+        threading.Thread(target=run, name='token-version-poller', daemon=True).start()
+
+    @staticmethod
+    def _refresh():
+        """Poll inline if due (only used when no poller thread is running)"""
+        now = time.time()
+        with TokenVersions._lock:
+            if now - TokenVersions._last_poll < TokenVersions.poll_interval:
+                return
+            TokenVersions._last_poll = now
+        TokenVersions._poll()
+
+    @staticmethod
+    def _poll():
+        """Apply changes made since the last poll (by any process)"""
+        now = time.time()
+        with TokenVersions._lock:
+            full = now - TokenVersions._last_full >= TokenVersions.full_refresh_interval
+            if full:
+                TokenVersions._last_full = now
+            cursor = TokenVersions._cursor
+            known = list(TokenVersions._versions)
+
+        deletions = TokenVersions._deletion_count()
+        with TokenVersions._lock:
+            if TokenVersions._deletions is not None and deletions != TokenVersions._deletions:
+                full = True
+            TokenVersions._deletions = deletions
+
+        if full:
+            rows = Admin_And_User.objects(id__in=known).only('id', 'token_version', 'updated_at') if known else []
+            fresh = {str(user.id): user.token_version or 0 for user in rows}
+            with TokenVersions._lock:
+                for user_id in known:
+                    if user_id not in TokenVersions._versions:
+                        continue  # evicted meanwhile
+                    if user_id in fresh:
+                        TokenVersions._versions[user_id] = fresh[user_id]
+                    else:
+                        TokenVersions._versions.pop(user_id, None)
+            if cursor is not None:
+                return
+
+        query = Admin_And_User.objects.only('id', 'token_version', 'updated_at')
+        if cursor is not None:
+            query = query.filter(updated_at__gte=cursor - TokenVersions.OVERLAP)
+        else:
+            # First poll only establishes the cursor
+            query = query.order_by('-updated_at').limit(1)
+
+        newest = cursor
+        updates = {}
+        for user in query:
+            updates[str(user.id)] = user.token_version or 0
+            if user.updated_at and (newest is None or user.updated_at > newest):
+                newest = user.updated_at
+
+        with TokenVersions._lock:
+            for user_id, version in updates.items():
+                if user_id in TokenVersions._versions:
+                    TokenVersions._versions[user_id] = version
+            if newest is not None:
+                TokenVersions._cursor = newest
+            elif TokenVersions._cursor is None:
+                TokenVersions._cursor = datetime.utcnow()
+
+    @staticmethod
+    def _deletion_count():
+        doc = CollectionVersion._get_collection().find_one({'key': TokenVersions.DELETIONS_KEY}, {'version': 1})
+        return doc.get('version', 0) if doc else 0
+
+    @staticmethod
+    def current(user_id):
+        """
+        Return the current token version of a user
+
+        Returns:
+            int: The version, or None if the user does not exist
+        """
+        user_id = str(user_id)
+        if TokenVersions._poller is None:
+            TokenVersions._refresh()
+        with TokenVersions._lock:
+            if user_id in TokenVersions._versions:
+                TokenVersions._versions.move_to_end(user_id)
+                return TokenVersions._versions[user_id]
+
+        user = Admin_And_User.objects(id=user_id).only('token_version').first()
+        if not user:
+            return None
+        version = user.token_version or 0
+        TokenVersions._remember(user_id, version)
+        return version
+
+    @staticmethod
+    def _remember(user_id, version):
+        with TokenVersions._lock:
+            TokenVersions._versions[user_id] = version
+            TokenVersions._versions.move_to_end(user_id)
+            while len(TokenVersions._versions) > TokenVersions.max_size:
+                TokenVersions._versions.popitem(last=False)
+
+    @staticmethod
+    def bump(user_id):
+        """
+        Revoke every token issued to a user so far
+
+        Returns:
+            int: The new token version
+        """
+        # Clearing auth_token also revokes legacy tokens (issued without `tv`)
+        Admin_And_User.objects(id=user_id).update_one(
+            inc__token_version=1,
+            unset__auth_token=True,
+            set__updated_at=datetime.utcnow()
+        )
+        user = Admin_And_User.objects(id=user_id).only('token_version').first()
+        version = (user.token_version or 0) if user else None
+        if version is None:
+            TokenVersions.forget(user_id)
+        else:
+            TokenVersions._remember(str(user_id), version)
+        return version
+
+    @staticmethod
+    def forget(user_id):
+        """Drop a user from the map (re-read on next use)"""
+        with TokenVersions._lock:
+            TokenVersions._versions.pop(str(user_id), None)
+
+    @staticmethod
+    def deleted(user_id):
+        """Drop a deleted user here, and in every other process at its next poll"""
+        TokenVersions.forget(user_id)
+        CollectionVersion._get_collection().update_one(
+            {'key': TokenVersions.DELETIONS_KEY},
+            {
+                '$inc': {'version': 1},
+                '$set': {'updated_at': datetime.now(timezone.utc)},
+                '$setOnInsert': {'epoch': uuid.uuid4().hex[:8]}
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def clear():
+        with TokenVersions._lock:
+            TokenVersions._versions.clear()
+            TokenVersions._cursor = None
+            TokenVersions._deletions = None
+            TokenVersions._last_poll = 0.0
+            TokenVersions._last_full = 0.0
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import tempfile
+from dotenv import load_dotenv
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+load_dotenv()
+
+# Per-file cap enforced while the multipart body is read
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", 10 * 1024 * 1024))
+# Files larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", 1024 * 1024))
+
+
+class SpooledUploadFile:
+    """
+    Destination of one uploaded file while the request body is parsed
+
+    Data is kept in memory up to UPLOAD_SPOOL_THRESHOLD and spilled to a
+    temporary file beyond it. Every chunk is hashed (SHA-256) and counted as it
+    arrives, and the first bytes are kept for type sniffing, so nothing has to
+    re-read the file afterwards. Writing past the per-file cap aborts parsing
+    with 413.
+    """
+
+    HEAD_SIZE = 32
+
+    def __init__(self, max_bytes=None, spool_threshold=None):
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=spool_threshold if spool_threshold is not None else UPLOAD_SPOOL_THRESHOLD
+        )
+        self._hash = hashlib.sha256()
+        self.max_bytes = max_bytes if max_bytes is not None else UPLOAD_MAX_FILE_BYTES
+        self.size = 0
+        self.head = b''
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Each file must be at most {self.max_bytes // (1024 * 1024)} MB")
+        if len(self.head) < self.HEAD_SIZE:
+            self.head += data[:self.HEAD_SIZE - len(self.head)]
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # read, readline, seek, tell, close, ... of the underlying spooled file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class UploadRequest(Request):
+    """Request class that streams multipart files into SpooledUploadFile"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledUploadFile()
+
+
+class ImageSniffer:
+    """
+    Detect an image format from its first bytes (never trusts the filename)
+    """
+
+    FORMATS = ('jpeg', 'png', 'gif', 'webp')
+
+    @staticmethod
+    def sniff(head):
+        """
+        Args:
+            head: First bytes of the file (at least 12)
+
+        Returns:
+            str: 'jpeg', 'png', 'gif' or 'webp', or None if not a supported image
+        """
+        if head.startswith(b'\xff\xd8\xff'):
+            return 'jpeg'
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return 'png'
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return 'gif'
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return 'webp'
+        return None
+
+    @staticmethod
+    def inspect(file):
+        """
+        Describe an uploaded FileStorage
+
+        Returns:
+            dict: { format, size, sha256 } (size/sha256 are None if the file was
+                  not streamed through SpooledUploadFile)
+        """
+        stream = file.stream
+        if isinstance(stream, SpooledUploadFile):
+            return {"format": ImageSniffer.sniff(stream.head), "size": stream.size, "sha256": stream.sha256}
+        position = stream.tell()
+        head = stream.read(SpooledUploadFile.HEAD_SIZE)
+        stream.seek(position)
+        return {"format": ImageSniffer.sniff(head), "size": None, "sha256": None}
@@ -13,14 +13,32 @@ from Routes.enquiryAdminRoutes import enquiry_admin_bp
 from Routes.landAdminRoutes import land_admin_bp
 from Routes.imageUploadRoutes import image_upload_bp
 from Routes.siteContentRoutes import site_content_bp
+from Routes.jobRoutes import job_bp
+from Routes.mediaRoutes import media_bp
+from Routes.metricsRoutes import metrics_bp
 from flask_cors import CORS
-from Utils.CheckAuthorization import CheckAuthorization
+from Utils.authContext import load_principal
+from Utils.tokenVersions import TokenVersions
+from Utils.uploadStream import UploadRequest
+from Utils.resilience import DependencyUnavailable
+from Utils.statsCounters import StatsCounters
+from Utils.imageAssets import ImageAssets
+from Utils.imageStorage import get_storage
+from Utils.httpCache import CollectionVersions
+from Utils.landingCache import LandingCache
+from Utils.dbIndexes import DbIndexes
+from Utils.jobQueue import JobQueue
+from Utils.jobHandlers import JobHandlers
 
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+
+# Uploads are streamed to size-capped, hashed spool files; whole requests are capped too
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", 60 * 1024 * 1024))
 print(os.getenv("DB_CONNECT_STRING"))
 
 # Check if using MongoDB Atlas (cloud) or local MongoDB
@@ -34,6 +52,35 @@ else:
 
 client = get_connection()
 
+# Create declared indexes and warn about hot queries that would scan whole collections
+DbIndexes.sync()
+if os.getenv("DB_INDEX_CHECK", "true").lower() in ['true', '1', 'yes']:
+    DbIndexes.check_hot_queries()
+
+# Keep the dashboard counters (stats_counters) in step with every document write
+StatsCounters.connect()
+StatsCounters.start_reconciler(int(os.getenv("STATS_RECONCILE_SECONDS", 3600)))
+
+# Token revocations (token_version changes) are picked up off the request path
+TokenVersions.start_poller()
+
+# Fail at startup, not on the first upload, if the image backend cannot work here
+storage = get_storage()
+# Locally stored images are served under the path of their base_url (unless it is another server's root)
+media_prefix = storage.route_prefix if storage.name == 'local' else ''
+
+# Reference counts of deduplicated images (image_assets) follow Land.images_urls
+ImageAssets.connect()
+
+# Collection write counters: version stamps of cacheable public responses (ETag)
+CollectionVersions.connect()
+# The cached public landing payload is rebuilt when a land shown on it changes
+LandingCache.connect()
+
+# Background jobs (image cleanup, bulk admin actions, counter reconciliation)
+JobHandlers.register_all()
+JobQueue.start(int(os.getenv("JOB_WORKERS", 2)))
+
 @app.before_request
 def check_auth_token():
     if request.method == 'OPTIONS':
@@ -54,6 +101,8 @@ def check_auth_token():
     except_prefixes = [
         '/api/user/enquiries/land'
     ]
+    if media_prefix:
+        except_prefixes.append(media_prefix + '/')  # Locally stored images
 
     # Check if current path matches any except route or prefix
     current_path = request.path
@@ -62,9 +111,10 @@ def check_auth_token():
         if not token:
             return jsonify({"error": "Token required"}), 401
         
-        verify = CheckAuthorization.VerifyToken(token)
-        if verify != True:
-            return verify
+        # Resolves the caller once and exposes it to controllers as g.principal
+        error = load_principal()
+        if error:
+            return error
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -76,6 +126,11 @@ def health_check():
 
     return jsonify({"status": "healthy", "database": db_status}), 200 if db_status == "connected" else 500
 
+@app.errorhandler(DependencyUnavailable)
+def dependency_unavailable(e):
+    # An external service is failing fast (circuit open) or past its deadline
+    return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
+
 # Register blueprints
 app.register_blueprint(land_bp, url_prefix='/api/land')
 app.register_blueprint(user_bp, url_prefix='/api/user')
@@ -88,6 +143,10 @@ app.register_blueprint(enquiry_admin_bp)  # Already has url_prefix in blueprint
 app.register_blueprint(land_admin_bp, url_prefix='/api/admin/lands')
 app.register_blueprint(image_upload_bp)  # Already has url_prefix in blueprint
 app.register_blueprint(site_content_bp, url_prefix='/api')
+app.register_blueprint(job_bp)  # Already has url_prefix in blueprint
+if media_prefix:
+    app.register_blueprint(media_bp, url_prefix=media_prefix)
+app.register_blueprint(metrics_bp)  # Already has url_prefix in blueprint
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))